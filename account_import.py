@@ -0,0 +1,225 @@
+import csv
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import cache
+from . import counters
+from . import models
+from .database import SessionLocal
+
+# Stays under SQLite's bound-parameter limit on older builds (999)
+IN_CHUNK_SIZE = 500
+# Rows per multi-row INSERT (3 columns each)
+INSERT_CHUNK_SIZE = 300
+# Rows validated and committed per transaction in file imports
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", 1000))
+# Finished jobs kept for the status endpoint
+MAX_IMPORT_JOBS = 50
+MAX_JOB_ERRORS = 20
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def split_batch_duplicates(rows):
+    """Returns (first occurrence of each username, usernames repeated inside the batch)."""
+    seen = set()
+    unique = []
+    repeated = []
+    for row in rows:
+        if row["username"] in seen:
+            if row["username"] not in repeated:
+                repeated.append(row["username"])
+            continue
+        seen.add(row["username"])
+        unique.append(row)
+    return unique, repeated
+
+
+def find_existing_usernames(db: Session, usernames) -> set:
+    """One chunked IN query instead of a lookup per username."""
+    existing = set()
+    usernames = list(usernames)
+    for chunk in _chunks(usernames, IN_CHUNK_SIZE):
+        existing.update(
+            u for (u,) in db.query(models.InstagramAccount.username)
+            .filter(models.InstagramAccount.username.in_(chunk))
+        )
+    return existing
+
+
+def insert_accounts(db: Session, rows, employee_id=None, count_assigned=True) -> int:
+    """Multi-row INSERT of {"username", "password"} dicts. Does not commit.
+
+    Bumps the employee's assigned_count unless the caller already reserved it.
+    """
+    values = [
+        {"username": r["username"], "password": r["password"], "assigned_employee_id": employee_id}
+        for r in rows
+    ]
+    for chunk in _chunks(values, INSERT_CHUNK_SIZE):
+        db.execute(insert(models.InstagramAccount).values(chunk))
+    if count_assigned:
+        counters.adjust_assigned(db, employee_id, len(values))
+    return len(values)
+
+
+# --- File imports ---
+
+class ImportJob:
+    def __init__(self, filename: str, employee_id=None):
+        self.id = uuid.uuid4().hex
+        self.filename = filename
+        self.employee_id = employee_id
+        self.status = "queued"
+        self.rows_read = 0
+        self.inserted = 0
+        self.duplicates = 0
+        self.invalid = 0
+        self.chunks_done = 0
+        self.errors = []
+        self.created_at = datetime.now()
+        self.finished_at = None
+
+    def add_error(self, msg: str):
+        if len(self.errors) < MAX_JOB_ERRORS:
+            self.errors.append(msg)
+
+    def as_dict(self):
+        return {
+            "id": self.id,
+            "filename": self.filename,
+            "employee_id": self.employee_id,
+            "status": self.status,
+            "rows_read": self.rows_read,
+            "inserted": self.inserted,
+            "duplicates": self.duplicates,
+            "invalid": self.invalid,
+            "chunks_done": self.chunks_done,
+            "errors": self.errors,
+            "created_at": self.created_at.strftime("%Y-%m-%d %H:%M:%S"),
+            "finished_at": self.finished_at.strftime("%Y-%m-%d %H:%M:%S") if self.finished_at else None,
+        }
+
+
+_jobs = OrderedDict()
+_jobs_lock = threading.Lock()
+
+
+def get_import_job(job_id: str):
+    with _jobs_lock:
+        return _jobs.get(job_id)
+
+
+def _register_job(job: ImportJob):
+    with _jobs_lock:
+        _jobs[job.id] = job
+        while len(_jobs) > MAX_IMPORT_JOBS:
+            _jobs.popitem(last=False)
+
+
+def _read_rows(f):
+    """Yields {"username", "password"} dicts from a CSV or TSV file, one line at a time."""
+    first = f.readline()
+    if not first:
+        return
+    delimiter = "\t" if "\t" in first else ","
+    header = next(csv.reader([first], delimiter=delimiter))
+    lowered = [h.strip().lower() for h in header]
+
+    if "username" in lowered:
+        user_idx = lowered.index("username")
+        pass_idx = lowered.index("password") if "password" in lowered else None
+        pending = []
+    else:
+        # No header: username, password by position
+        user_idx, pass_idx = 0, 1
+        pending = [header]
+
+    def to_row(fields):
+        username = fields[user_idx].strip() if len(fields) > user_idx else ""
+        password = fields[pass_idx].strip() if pass_idx is not None and len(fields) > pass_idx else ""
+        return {"username": username, "password": password}
+
+    for fields in pending:
+        yield to_row(fields)
+    for fields in csv.reader(f, delimiter=delimiter):
+        if fields:
+            yield to_row(fields)
+
+
+def _import_chunk(db: Session, job: ImportJob, rows):
+    valid = []
+    for row in rows:
+        if not row["username"]:
+            job.invalid += 1
+            continue
+        valid.append(row)
+
+    unique, _ = split_batch_duplicates(valid)
+    job.duplicates += len(valid) - len(unique)
+
+    for attempt in range(2):
+        existing = find_existing_usernames(db, [r["username"] for r in unique])
+        fresh = [r for r in unique if r["username"] not in existing]
+        try:
+            insert_accounts(db, fresh, job.employee_id)
+            db.commit()
+        except IntegrityError:
+            # Raced with another writer; look the usernames up again once
+            db.rollback()
+            continue
+        if fresh:
+            cache.bump(cache.ACCOUNTS)
+        job.duplicates += len(unique) - len(fresh)
+        job.inserted += len(fresh)
+        return
+    job.add_error(f"Chunk {job.chunks_done + 1}: could not insert because of concurrent writes")
+
+
+def run_import_job(job: ImportJob, path: str):
+    """Parses the spooled upload and inserts it in IMPORT_CHUNK_SIZE transactions."""
+    job.status = "running"
+    db = SessionLocal()
+    try:
+        with open(path, newline="", encoding="utf-8-sig", errors="replace") as f:
+            chunk = []
+            for row in _read_rows(f):
+                job.rows_read += 1
+                chunk.append(row)
+                if len(chunk) >= IMPORT_CHUNK_SIZE:
+                    _import_chunk(db, job, chunk)
+                    job.chunks_done += 1
+                    chunk = []
+            if chunk:
+                _import_chunk(db, job, chunk)
+                job.chunks_done += 1
+        job.status = "done"
+    except Exception as e:
+        db.rollback()
+        job.status = "failed"
+        job.add_error(str(e))
+        print(f"Account import error: {e}")
+    finally:
+        db.close()
+        job.finished_at = datetime.now()
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def start_import_job(filename: str, path: str, employee_id=None) -> ImportJob:
+    job = ImportJob(filename, employee_id)
+    _register_job(job)
+    threading.Thread(target=run_import_job, args=(job, path), name=f"import-{job.id[:8]}", daemon=True).start()
+    return job
@@ -0,0 +1,281 @@
+"""Follower-growth analytics over daily_reports.
+
+A report's delta is its follower_count minus the same account's previous
+report (LAG over the account, ordered by date). Rolling growth sums the
+deltas of the last 7 / 30 reports - one per day when an account is reported
+daily. Range figures sum the deltas of reports inside [start, end].
+
+Window functions do the work in SQL on Postgres and SQLite >= 3.25; older
+SQLite builds fall back to NumPy over one ordered scan of the rows. History
+is read from LOOKBACK_DAYS before the range so the first day of the range
+has a previous report and full rolling windows.
+"""
+import os
+import sqlite3
+from datetime import date, timedelta
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from . import models
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+LOOKBACK_DAYS = 30
+ROLLING_WINDOWS = (7, 30)
+# auto | sql | numpy (forcing one is mostly useful for benchmarks)
+ANALYTICS_ENGINE = os.getenv("ANALYTICS_ENGINE", "auto")
+
+R = models.DailyReport
+
+
+class AnalyticsUnavailable(Exception):
+    pass
+
+
+def window_functions_supported(db: Session) -> bool:
+    dialect = db.get_bind().dialect
+    if dialect.name == "sqlite":
+        version = getattr(dialect.dbapi, "sqlite_version_info", sqlite3.sqlite_version_info)
+        return tuple(version) >= (3, 25, 0)
+    return True
+
+
+def choose_engine(db: Session) -> str:
+    if ANALYTICS_ENGINE in ("sql", "numpy"):
+        engine = ANALYTICS_ENGINE
+    else:
+        engine = "sql" if window_functions_supported(db) else "numpy"
+    if engine == "numpy" and np is None:
+        raise AnalyticsUnavailable("Growth analytics need SQLite >= 3.25 (window functions) or numpy installed")
+    return engine
+
+
+# --- SQL (window functions) ---
+
+def _deltas(start, end, account_id=None, employee_id=None):
+    """Reports in [start - LOOKBACK_DAYS, end] with their delta to the account's previous report."""
+    prev = func.lag(R.follower_count).over(partition_by=R.instagram_account_id, order_by=[R.date, R.id])
+    stmt = select(
+        R.instagram_account_id.label("account_id"),
+        R.employee_id.label("employee_id"),
+        R.date.label("day"),
+        R.follower_count.label("follower_count"),
+        (R.follower_count - prev).label("delta")
+    ).where(
+        R.date >= start - timedelta(days=LOOKBACK_DAYS),
+        R.date <= end,
+        R.instagram_account_id != None
+    )
+    if account_id is not None:
+        stmt = stmt.where(R.instagram_account_id == account_id)
+    if employee_id is not None:
+        stmt = stmt.where(R.employee_id == employee_id)
+    return stmt.subquery()
+
+
+def _sql_range_growth(db: Session, start, end):
+    """[(account_id, employee_id, growth, reports)] for reports inside [start, end]."""
+    d = _deltas(start, end)
+    return db.execute(
+        select(d.c.account_id, d.c.employee_id, func.sum(func.coalesce(d.c.delta, 0)), func.count(d.c.delta))
+        .where(d.c.day >= start)
+        .group_by(d.c.account_id, d.c.employee_id)
+    ).all()
+
+
+def _sql_account_series(db: Session, account_id: int, start, end):
+    d = _deltas(start, end, account_id=account_id)
+    delta = func.coalesce(d.c.delta, 0)
+    rolling = [
+        func.sum(delta).over(order_by=d.c.day, rows=(-(n - 1), 0)).label(f"rolling_{n}d")
+        for n in ROLLING_WINDOWS
+    ]
+    windowed = select(d.c.day, d.c.follower_count, d.c.delta, *rolling).subquery()
+    # Filter after the window so the first days of the range still see their history
+    return db.execute(select(windowed).where(windowed.c.day >= start).order_by(windowed.c.day)).all()
+
+
+def _sql_employee_series(db: Session, employee_id: int, start, end):
+    d = _deltas(start, end, employee_id=employee_id)
+    daily = select(
+        d.c.day,
+        func.sum(d.c.follower_count).label("follower_count"),
+        func.sum(func.coalesce(d.c.delta, 0)).label("delta")
+    ).group_by(d.c.day).subquery()
+    rolling = [
+        func.sum(daily.c.delta).over(order_by=daily.c.day, rows=(-(n - 1), 0)).label(f"rolling_{n}d")
+        for n in ROLLING_WINDOWS
+    ]
+    windowed = select(daily.c.day, daily.c.follower_count, daily.c.delta, *rolling).subquery()
+    return db.execute(select(windowed).where(windowed.c.day >= start).order_by(windowed.c.day)).all()
+
+
+# --- NumPy fallback ---
+
+def _np_rows(db: Session, start, end, account_id=None, employee_id=None):
+    stmt = select(R.instagram_account_id, R.employee_id, R.date, R.follower_count).where(
+        R.date >= start - timedelta(days=LOOKBACK_DAYS),
+        R.date <= end,
+        R.instagram_account_id != None
+    )
+    if account_id is not None:
+        stmt = stmt.where(R.instagram_account_id == account_id)
+    if employee_id is not None:
+        stmt = stmt.where(R.employee_id == employee_id)
+    rows = db.execute(stmt.order_by(R.instagram_account_id, R.date, R.id)).all()
+    days = [r[2] for r in rows]
+    return (
+        np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows)),
+        np.fromiter((r[1] if r[1] is not None else -1 for r in rows), dtype=np.int64, count=len(rows)),
+        np.fromiter((d.toordinal() for d in days), dtype=np.int64, count=len(rows)),
+        np.fromiter((r[3] or 0 for r in rows), dtype=np.int64, count=len(rows)),
+    )
+
+
+def _np_deltas(accounts, counts):
+    """Delta to the previous row of the same account; has_prev marks rows that have one."""
+    has_prev = np.zeros(len(accounts), dtype=bool)
+    has_prev[1:] = accounts[1:] == accounts[:-1]
+    delta = np.zeros(len(accounts), dtype=np.int64)
+    delta[1:] = counts[1:] - counts[:-1]
+    delta[~has_prev] = 0
+    return delta, has_prev
+
+
+def _np_rolling(values, n):
+    """Sum of the last n values, current one included (cumulative sum differences)."""
+    cs = np.concatenate(([0], np.cumsum(values)))
+    idx = np.arange(len(values))
+    return cs[idx + 1] - cs[np.maximum(idx + 1 - n, 0)]
+
+
+def _np_range_growth(db: Session, start, end):
+    accounts, employees, days, counts = _np_rows(db, start, end)
+    delta, has_prev = _np_deltas(accounts, counts)
+    mask = days >= start.toordinal()
+    pairs, inverse = np.unique(np.stack([accounts[mask], employees[mask]], axis=1), axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    sums = np.bincount(inverse, weights=delta[mask], minlength=len(pairs))
+    reports = np.bincount(inverse, weights=has_prev[mask], minlength=len(pairs))
+    return [
+        (int(a), int(e) if e >= 0 else None, int(s), int(c))
+        for (a, e), s, c in zip(pairs, sums, reports)
+    ]
+
+
+def _np_series(days, counts, delta, has_prev, start):
+    rolling = [_np_rolling(delta, n) for n in ROLLING_WINDOWS]
+    out = []
+    for i in np.flatnonzero(days >= start.toordinal()):
+        out.append((
+            date.fromordinal(int(days[i])), int(counts[i]), int(delta[i]) if has_prev[i] else None,
+            *(int(r[i]) for r in rolling)
+        ))
+    return out
+
+
+def _np_account_series(db: Session, account_id: int, start, end):
+    accounts, _, days, counts = _np_rows(db, start, end, account_id=account_id)
+    delta, has_prev = _np_deltas(accounts, counts)
+    return _np_series(days, counts, delta, has_prev, start)
+
+
+def _np_employee_series(db: Session, employee_id: int, start, end):
+    accounts, _, days, counts = _np_rows(db, start, end, employee_id=employee_id)
+    delta, _ = _np_deltas(accounts, counts)
+    # Collapse the employee's accounts into one row per day
+    uniq_days, inverse = np.unique(days, return_inverse=True)
+    day_counts = np.bincount(inverse, weights=counts, minlength=len(uniq_days)).astype(np.int64)
+    day_delta = np.bincount(inverse, weights=delta, minlength=len(uniq_days)).astype(np.int64)
+    return _np_series(uniq_days, day_counts, day_delta, np.ones(len(uniq_days), dtype=bool), start)
+
+
+# --- Public API ---
+
+def _names(db: Session, account_ids):
+    if not account_ids:
+        return {}
+    rows = db.query(models.InstagramAccount.id, models.InstagramAccount.username, models.Employee.full_name)\
+        .outerjoin(models.Employee, models.Employee.id == models.InstagramAccount.assigned_employee_id)\
+        .filter(models.InstagramAccount.id.in_(list(account_ids))).all()
+    return {r[0]: (r[1], r[2]) for r in rows}
+
+
+def growth_summary(db: Session, start, end, k: int = 10):
+    """Top-k gaining / losing accounts and per-employee growth over [start, end]."""
+    engine = choose_engine(db)
+    rows = (_sql_range_growth if engine == "sql" else _np_range_growth)(db, start, end)
+
+    # One scan grouped by (account, employee), rolled up both ways here
+    by_account = {}
+    by_employee = {}
+    for account_id, employee_id, growth, reports in rows:
+        growth, reports = int(growth or 0), int(reports or 0)
+        acc = by_account.setdefault(account_id, [0, 0])
+        acc[0] += growth
+        acc[1] += reports
+        if employee_id is not None:
+            emp = by_employee.setdefault(employee_id, [0, 0])
+            emp[0] += growth
+            emp[1] += reports
+
+    accounts = sorted(((a, g, c) for a, (g, c) in by_account.items()), key=lambda r: (-r[1], r[0]))
+    gainers = [r for r in accounts if r[1] > 0][:k]
+    losers = [r for r in reversed(accounts) if r[1] < 0][:k]
+    names = _names(db, {r[0] for r in gainers + losers})
+
+    def account_row(r):
+        username, employee_name = names.get(r[0], (None, None))
+        return {
+            "account_id": r[0],
+            "account": username or "-",
+            "employee_name": employee_name or "-",
+            "growth": r[1],
+            "reports": r[2]
+        }
+
+    employee_names = dict(db.query(models.Employee.id, models.Employee.full_name).all())
+    employees = sorted(((e, g, c) for e, (g, c) in by_employee.items()), key=lambda r: (-r[1], r[0]))
+
+    return {
+        "start_date": start.isoformat(),
+        "end_date": end.isoformat(),
+        "engine": engine,
+        "total_growth": sum(r[1] for r in accounts),
+        "gainers": [account_row(r) for r in gainers],
+        "losers": [account_row(r) for r in losers],
+        "employees": [{
+            "employee_id": r[0],
+            "employee_name": employee_names.get(r[0]) or "-",
+            "growth": r[1],
+            "reports": r[2]
+        } for r in employees]
+    }
+
+
+def growth_series(db: Session, start, end, account_id=None, employee_id=None):
+    """Per-day follower_count, delta and rolling growth for one account or one employee."""
+    engine = choose_engine(db)
+    if account_id is not None:
+        rows = (_sql_account_series if engine == "sql" else _np_account_series)(db, account_id, start, end)
+    else:
+        rows = (_sql_employee_series if engine == "sql" else _np_employee_series)(db, employee_id, start, end)
+
+    series = []
+    for r in rows:
+        item = {"date": r[0].isoformat(), "follower_count": int(r[1] or 0), "delta": None if r[2] is None else int(r[2])}
+        for n, value in zip(ROLLING_WINDOWS, r[3:]):
+            item[f"rolling_{n}d"] = int(value or 0)
+        series.append(item)
+    return {
+        "start_date": start.isoformat(),
+        "end_date": end.isoformat(),
+        "engine": engine,
+        "account_id": account_id,
+        "employee_id": employee_id,
+        "series": series
+    }
@@ -0,0 +1,150 @@
+"""Hot endpoints on the async database layer.
+
+Only registered when database.ASYNC_DB is on. main.py includes this router before
+its own routes, so these handlers take precedence over the sync versions there.
+"""
+from datetime import timedelta
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import select
+
+from . import auth
+from . import cache
+from . import events
+from . import fastjson
+from . import models
+from . import rollups
+from .audit import audit_writer
+from .database import get_async_db, get_dialect_insert
+from .events import event_broker
+from .rollover import get_today_date
+from .schemas import EmployeeDashboardData, ReportCreate, Token
+
+router = APIRouter()
+
+
+async def create_audit_log_async(db, user_id: int, action: str, details: str, ip: str):
+    if audit_writer.running:
+        audit_writer.enqueue(user_id, action, details, ip)
+        return
+    try:
+        db.add(models.AuditLog(user_id=user_id, action=action, details=details, ip_address=ip))
+        await db.commit()
+    except Exception as e:
+        print(f"Audit log error: {e}")
+
+
+async def _add_report_totals(db, employee_id: int, day, follower_delta: int, report_delta: int = 0):
+    # Async drivers are SQLite/Postgres only, so the ON CONFLICT upserts always apply
+    dialect_insert = get_dialect_insert(db.sync_session)
+    for stmt in rollups.report_totals_statements(dialect_insert, employee_id, day, follower_delta, report_delta):
+        await db.execute(stmt)
+
+
+async def _publish_report_event(db, status: str, today, employee_id: int, acc, count: int):
+    if not event_broker.active:
+        return
+    name = (await db.execute(select(models.Employee.full_name).where(models.Employee.id == employee_id))).scalar()
+    event_broker.publish("report", events.report_event(status, today, employee_id, name, acc.id, acc.username, count))
+
+
+@router.post("/api/login", response_model=Token)
+async def login_for_access_token(request: Request, form_data: OAuth2PasswordRequestForm = Depends(), db=Depends(get_async_db)):
+    result = await db.execute(
+        select(models.User.id, models.User.username, models.User.role, models.User.password_hash)
+        .where(models.User.username == form_data.username)
+    )
+    user = result.first()
+    if not user or not await auth.verify_password_async(form_data.password, user.password_hash):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect username or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    await create_audit_log_async(db, user.id, "LOGIN", "User logged in", request.client.host)
+
+    access_token_expires = timedelta(minutes=auth.ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token = auth.create_access_token(
+        data={"sub": user.username, "role": user.role}, expires_delta=access_token_expires
+    )
+    return {"access_token": access_token, "token_type": "bearer", "role": user.role}
+
+
+@router.get("/api/employee/dashboard-data", response_model=EmployeeDashboardData)
+async def get_employee_dashboard_data(request: Request, db=Depends(get_async_db), current_user: auth.Principal = Depends(auth.get_current_active_employee_async)):
+    emp = (await db.execute(
+        select(models.Employee.account_quota).where(models.Employee.id == current_user.employee_id)
+    )).first()
+    if emp is None:
+        raise HTTPException(status_code=404, detail="Employee not found")
+
+    rows = (await db.execute(
+        select(models.InstagramAccount.id, models.InstagramAccount.username, models.InstagramAccount.password)
+        .where(models.InstagramAccount.assigned_employee_id == current_user.employee_id)
+        .order_by(models.InstagramAccount.id)
+    )).all()
+    return fastjson.fast_json(request, {
+        "quota": emp.account_quota or 0,
+        "assigned_accounts": [{"id": r[0], "username": r[1], "password": r[2] or ""} for r in rows]
+    })
+
+
+@router.post("/employee/report")
+async def submit_report(rep: ReportCreate, request: Request, db=Depends(get_async_db), current_user: auth.Principal = Depends(auth.get_current_active_employee_async)):
+    today = get_today_date()
+
+    # Check if account belongs to employee
+    acc = (await db.execute(
+        select(models.InstagramAccount.id, models.InstagramAccount.username, models.InstagramAccount.assigned_employee_id)
+        .where(models.InstagramAccount.id == rep.instagram_account_id)
+    )).first()
+    if not acc or acc.assigned_employee_id != current_user.employee_id:
+        raise HTTPException(status_code=403, detail="Not authorized for this account")
+
+    existing = (await db.execute(
+        select(models.DailyReport).where(
+            models.DailyReport.employee_id == current_user.employee_id,
+            models.DailyReport.instagram_account_id == acc.id,
+            models.DailyReport.date == today
+        )
+    )).scalars().first()
+
+    if existing:
+        if existing.locked:
+            raise HTTPException(status_code=400, detail="Report is locked")
+        await _add_report_totals(db, current_user.employee_id, today, rep.follower_count - (existing.follower_count or 0))
+        existing.follower_count = rep.follower_count
+        await db.commit()
+        cache.bump(cache.REPORTS)
+        await _publish_report_event(db, "updated", today, current_user.employee_id, acc, rep.follower_count)
+        await create_audit_log_async(db, current_user.id, "UPDATE_REPORT", f"Updated report for {acc.username}: {rep.follower_count}", request.client.host)
+        return {"status": "updated"}
+
+    db.add(models.DailyReport(
+        employee_id=current_user.employee_id,
+        instagram_account_id=acc.id,
+        date=today,
+        follower_count=rep.follower_count
+    ))
+    await _add_report_totals(db, current_user.employee_id, today, rep.follower_count, 1)
+    await db.commit()
+    cache.bump(cache.REPORTS)
+    await _publish_report_event(db, "submitted", today, current_user.employee_id, acc, rep.follower_count)
+
+    await create_audit_log_async(db, current_user.id, "SUBMIT_REPORT", f"Report for {acc.username}: {rep.follower_count}", request.client.host)
+    return {"status": "success"}
+
+
+@router.get("/employee/report-status")
+async def get_today_reports(db=Depends(get_async_db), current_user: auth.Principal = Depends(auth.get_current_active_employee_async)):
+    today = get_today_date()
+    rows = (await db.execute(
+        select(models.DailyReport.instagram_account_id, models.DailyReport.follower_count, models.DailyReport.locked)
+        .where(
+            models.DailyReport.employee_id == current_user.employee_id,
+            models.DailyReport.date == today
+        )
+    )).all()
+    return [{"account_id": r.instagram_account_id, "count": r.follower_count, "locked": r.locked} for r in rows]
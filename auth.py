@@ -1,24 +1,42 @@
 
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
+import asyncio
+import threading
+import time
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 import os
 from dotenv import load_dotenv
 
 from . import models
-from .database import get_db
+from .database import get_db, get_async_db
 
 load_dotenv()
 
 SECRET_KEY = os.getenv("SECRET_KEY", "secret")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
+# Work factor for new hashes; existing hashes keep the rounds they were made with
+PASSWORD_HASH_ROUNDS = int(os.getenv("PASSWORD_HASH_ROUNDS", 29000))
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", 2))
+# Hash jobs allowed to run or wait at once; beyond this callers get a 503
+HASH_MAX_PENDING = int(os.getenv("HASH_MAX_PENDING", 32))
+PRINCIPAL_CACHE_SIZE = int(os.getenv("PRINCIPAL_CACHE_SIZE", 4096))
+# Short TTL: invalidation is per process, other workers see changes after at most this long
+PRINCIPAL_CACHE_TTL = int(os.getenv("PRINCIPAL_CACHE_TTL", 60))
 
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["pbkdf2_sha256"],
+    deprecated="auto",
+    pbkdf2_sha256__default_rounds=PASSWORD_HASH_ROUNDS,
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
 def verify_password(plain_password, hashed_password):
@@ -27,6 +45,67 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
+class HashingPool:
+    """Runs password hashing in a small dedicated executor with a cap on queued jobs."""
+
+    def __init__(self, workers=HASH_WORKERS, max_pending=HASH_MAX_PENDING):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pwd-hash")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please try again",
+                headers={"Retry-After": "1"},
+            )
+        with self._lock:
+            self.pending += 1
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, _future):
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+        self._slots.release()
+
+    async def run(self, fn, *args):
+        """Awaitable version for async endpoints: the event loop never runs the hash."""
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def run_sync(self, fn, *args):
+        """Blocking version for sync endpoints (already off the event loop)."""
+        return self.submit(fn, *args).result()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self.pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "rounds": PASSWORD_HASH_ROUNDS,
+            }
+
+hashing_pool = HashingPool()
+
+async def verify_password_async(plain_password, hashed_password):
+    return await hashing_pool.run(verify_password, plain_password, hashed_password)
+
+def hash_password_bounded(password):
+    return hashing_pool.run_sync(get_password_hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -38,35 +117,160 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
+class Principal:
+    """The authenticated user as seen by the endpoints: just ids and role, no ORM state."""
+    __slots__ = ("id", "username", "role", "employee_id")
+
+    def __init__(self, id: int, username: str, role: str, employee_id: Optional[int] = None):
+        self.id = id
+        self.username = username
+        self.role = role
+        self.employee_id = employee_id
+
+class PrincipalCache:
+    """Bounded LRU of token -> Principal with a TTL (never past the token's own expiry)."""
+
+    def __init__(self, max_size=PRINCIPAL_CACHE_SIZE, ttl=PRINCIPAL_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, token: str):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[token]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, token: str, principal: Principal, token_exp: Optional[float] = None):
+        ttl = self.ttl
+        if token_exp is not None:
+            ttl = min(ttl, token_exp - time.time())
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[token] = (time.monotonic() + ttl, principal)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate_user(self, user_id: Optional[int] = None, username: Optional[str] = None):
+        with self._lock:
+            stale = [
+                token for token, (_, p) in self._entries.items()
+                if (user_id is not None and p.id == user_id) or (username is not None and p.username == username)
+            ]
+            for token in stale:
+                del self._entries[token]
+            self.invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+principal_cache = PrincipalCache()
+
+def load_principal(db: Session, username: str) -> Optional[Principal]:
+    row = db.execute(_principal_query(username)).first()
+    if row is None:
+        return None
+    return Principal(row[0], row[1], row[2], row[3])
+
+def _principal_query(username: str):
+    return select(
+        models.User.id, models.User.username, models.User.role, models.Employee.id
+    ).outerjoin(models.Employee, models.Employee.user_id == models.User.id)\
+     .where(models.User.username == username)
+
+async def load_principal_async(db, username: str) -> Optional[Principal]:
+    row = (await db.execute(_principal_query(username))).first()
+    if row is None:
+        return None
+    return Principal(row[0], row[1], row[2], row[3])
+
+def _credentials_exception():
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+def _decode_token(token: str):
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        role: str = payload.get("role")
-        if username is None:
-            raise credentials_exception
-        token_data = {"username": username, "role": role}
     except JWTError:
-        raise credentials_exception
-    
-    user = db.query(models.User).filter(models.User.username == username).first()
-    if user is None:
-        raise credentials_exception
-    return user
+        raise _credentials_exception()
+    if payload.get("sub") is None:
+        raise _credentials_exception()
+    return payload
+
+def authenticate_token(db: Session, token: str) -> Principal:
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
 
-async def get_current_active_admin(current_user: models.User = Depends(get_current_user)):
+    payload = _decode_token(token)
+    principal = load_principal(db, payload["sub"])
+    if principal is None:
+        raise _credentials_exception()
+    principal_cache.put(token, principal, payload.get("exp"))
+    return principal
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    return authenticate_token(db, token)
+
+async def get_current_user_async(token: str = Depends(oauth2_scheme), db=Depends(get_async_db)):
+    """Same as get_current_user, for endpoints running on the async database layer."""
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+
+    payload = _decode_token(token)
+    principal = await load_principal_async(db, payload["sub"])
+    if principal is None:
+        raise _credentials_exception()
+    principal_cache.put(token, principal, payload.get("exp"))
+    return principal
+
+async def get_current_active_admin(current_user: Principal = Depends(get_current_user)):
     if current_user.role != "admin":
         raise HTTPException(
             status_code=403, detail="The user doesn't have enough privileges"
         )
     return current_user
 
-async def get_current_active_employee(current_user: models.User = Depends(get_current_user)):
+async def get_current_active_employee(current_user: Principal = Depends(get_current_user)):
+    if current_user.role != "employee":
+         raise HTTPException(
+            status_code=403, detail="The user doesn't have enough privileges"
+        )
+    return current_user
+
+async def get_current_active_employee_async(current_user: Principal = Depends(get_current_user_async)):
     if current_user.role != "employee":
          raise HTTPException(
             status_code=403, detail="The user doesn't have enough privileges"
@@ -0,0 +1,12 @@
+"""In-process load tests for the panel API.
+
+Runs the FastAPI app through httpx's ASGI transport (no network, no uvicorn)
+against a synthetic dataset from seed.generate_dataset, and reports per
+endpoint throughput, p50/p95/p99 latency and SQL statements per request.
+
+    python -m backend.bench --generate --employees 100 --accounts 20000 --days 180
+    python -m backend.bench --out bench.json --baseline bench/baseline.json
+
+The bench uses its own database (sqlite:///./bench.db unless --database-url or
+BENCH_DATABASE_URL say otherwise) so it never writes to the panel's data.
+"""
@@ -0,0 +1,217 @@
+"""CLI entry point: python -m backend.bench --help"""
+import argparse
+import asyncio
+import os
+import platform
+import subprocess
+import sys
+import time
+
+DEFAULT_DATABASE_URL = "sqlite:///./bench.db"
+DATABASE_MODES = ("sync", "async")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="In-process load test for the panel API.")
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL", DEFAULT_DATABASE_URL))
+    parser.add_argument("--generate", action="store_true", help="generate the synthetic dataset before running")
+    parser.add_argument("--reset", action="store_true", help="delete the SQLite bench database first")
+    parser.add_argument("--employees", type=int, default=50)
+    parser.add_argument("--accounts", type=int, default=5000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--prefix", default="synth")
+    parser.add_argument("--scenarios", default="login_storm,report_submissions,admin_polling,large_lists,growth_analytics,mixed",
+                        help="comma separated, run in this order")
+    parser.add_argument("--users", type=int, default=50, help="employees taking part in the run")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--reports-per-employee", type=int, default=10)
+    parser.add_argument("--polls", type=int, default=50)
+    parser.add_argument("--out", default="bench-results.json")
+    parser.add_argument("--baseline", default=None, help="compare against this results file")
+    parser.add_argument("--update-baseline", action="store_true", help="write the results to --baseline instead of comparing")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative regression (0.2 = 20%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=2.0, help="ignore latency changes smaller than this")
+    parser.add_argument("--modes", default=None,
+                        help="comma separated database modes (sync,async): run the same scenarios once per mode, "
+                             "each in its own process, and report them side by side")
+    return parser.parse_args()
+
+
+def _mode_path(path, mode):
+    root, ext = os.path.splitext(path)
+    return f"{root}.{mode}{ext or '.json'}"
+
+
+def _sync_url(url):
+    for driver in ("+aiosqlite", "+asyncpg"):
+        url = url.replace(driver, "", 1)
+    return url
+
+
+def run_modes(args, modes):
+    """Runs the bench once per database mode in a child process (the engine is built on import,
+    so one process can't switch modes), then prints the modes side by side."""
+    from . import stats
+
+    status = 0
+    outputs = {}
+    for i, mode in enumerate(modes):
+        cmd = [
+            sys.executable, "-m", __package__,
+            "--database-url", _sync_url(args.database_url),
+            "--employees", str(args.employees), "--accounts", str(args.accounts), "--days", str(args.days),
+            "--seed", str(args.seed), "--prefix", args.prefix, "--scenarios", args.scenarios,
+            "--users", str(args.users), "--concurrency", str(args.concurrency),
+            "--reports-per-employee", str(args.reports_per_employee), "--polls", str(args.polls),
+            "--tolerance", str(args.tolerance), "--min-delta-ms", str(args.min_delta_ms),
+            "--out", _mode_path(args.out, mode),
+        ]
+        # Same data for every mode: generate it in the first run only
+        if args.generate and i == 0:
+            cmd.append("--generate")
+        if args.baseline:
+            cmd += ["--baseline", _mode_path(args.baseline, mode)]
+            if args.update_baseline:
+                cmd.append("--update-baseline")
+        env = dict(os.environ)
+        env.pop("DATABASE_ASYNC", None)
+        if mode == "async":
+            env["DATABASE_ASYNC"] = "1"
+
+        print(f"=== {mode} ===", flush=True)
+        code = subprocess.call(cmd, env=env)
+        status = max(status, code)
+        out = _mode_path(args.out, mode)
+        if os.path.exists(out):
+            outputs[mode] = stats.load(out)
+            if outputs[mode]["meta"].get("mode") != mode:
+                print(f"WARNING: the {mode} run reported mode {outputs[mode]['meta'].get('mode')!r}")
+                status = max(status, 1)
+        else:
+            print(f"The {mode} run failed (exit code {code})")
+            status = max(status, 2)
+
+    if outputs:
+        stats.save(args.out, {"modes": outputs})
+        print(f"\nCombined results written to {args.out}")
+        print_modes(outputs)
+    return status
+
+
+def print_modes(outputs):
+    modes = list(outputs)
+    header = "".join(f"{m + ' p95 ms':>16}{m + ' rps':>12}" for m in modes)
+    for scenario in next(iter(outputs.values()))["scenarios"]:
+        print(f"\n{scenario:<48}{header}")
+        endpoints = {}
+        for mode in modes:
+            for endpoint, figures in outputs[mode]["scenarios"].get(scenario, {}).items():
+                endpoints.setdefault(endpoint, {})[mode] = figures
+        for endpoint, by_mode in endpoints.items():
+            cells = "".join(
+                f"{by_mode[m]['p95_ms']:>16}{by_mode[m]['throughput_rps']:>12}" if m in by_mode else f"{'-':>16}{'-':>12}"
+                for m in modes
+            )
+            print(f"  {endpoint:<46}{cells}")
+        cpu = ", ".join(f"{m} {outputs[m].get('cpu', {}).get(scenario, {}).get('cpu_ms_per_request', '-')}" for m in modes)
+        print(f"  CPU ms/request: {cpu}")
+
+
+def main():
+    args = parse_args()
+
+    if args.reset:
+        url = _sync_url(args.database_url)
+        if not url.startswith("sqlite:///"):
+            print("--reset only deletes SQLite files; drop the bench database yourself.")
+            return 2
+        path = url[len("sqlite:///"):]
+        if os.path.exists(path):
+            os.remove(path)
+
+    if args.modes:
+        modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+        unknown = [m for m in modes if m not in DATABASE_MODES]
+        if unknown:
+            print(f"Unknown modes: {', '.join(unknown)} (known: {', '.join(DATABASE_MODES)})")
+            return 2
+        return run_modes(args, modes)
+
+    # The engine is built on import, so the URL has to be in place before the app is imported
+    os.environ["DATABASE_URL"] = args.database_url
+
+    from ..database import ASYNC_DB
+    from ..seed import seed_db, generate_dataset
+    from ..rollover import get_today_date
+    from .scenarios import SCENARIOS
+    from . import stats
+
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = [s for s in scenarios if s not in SCENARIOS]
+    if unknown:
+        print(f"Unknown scenarios: {', '.join(unknown)} (known: {', '.join(SCENARIOS)})")
+        return 2
+
+    seed_db()
+    if args.generate:
+        print("Generating dataset...")
+        generate_dataset(employees=args.employees, accounts=args.accounts, days=args.days,
+                         seed=args.seed, end_date=get_today_date(), prefix=args.prefix)
+
+    from .runner import run
+    print("Running scenarios...")
+    results = {
+        "meta": {
+            "database": args.database_url.split("://", 1)[0],
+            "mode": "async" if ASYNC_DB else "sync",
+            "users": args.users,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+    }
+    results.update(asyncio.run(run(
+        scenarios, prefix=args.prefix, users=args.users, concurrency=args.concurrency,
+        seed=args.seed, reports_per_employee=args.reports_per_employee, polls=args.polls,
+    )))
+    stats.save(args.out, results)
+    print(f"Results written to {args.out}")
+
+    for scenario, endpoints in results["scenarios"].items():
+        cpu = results["cpu"][scenario]
+        print(f"\n{scenario}  (CPU {cpu['cpu_s']}s, {cpu['cpu_ms_per_request']}ms/request, utilization {cpu['cpu_utilization']})")
+        for endpoint, figures in endpoints.items():
+            print(f"  {endpoint:<40} {figures['requests']:>6} req {figures['throughput_rps']:>9} rps  "
+                  f"p50 {figures['p50_ms']:>8}ms  p95 {figures['p95_ms']:>8}ms  p99 {figures['p99_ms']:>8}ms  "
+                  f"sql {figures['sql_statements']}  {figures['bytes_per_response']:>8} B/resp  "
+                  f"{figures['bytes_per_s']:>10} B/s  errors {figures['errors']}")
+
+    failing = [(scenario, endpoint, figures["statuses"])
+               for scenario, endpoints in results["scenarios"].items()
+               for endpoint, figures in endpoints.items() if figures["errors"]]
+    if failing:
+        print(f"\nWARNING: {len(failing)} endpoint(s) returned errors, their timings are not comparable:")
+        for scenario, endpoint, statuses in failing:
+            print(f"  {scenario} {endpoint}: {statuses}")
+
+    if not args.baseline:
+        return 0
+    if args.update_baseline or not os.path.exists(args.baseline):
+        stats.save(args.baseline, results)
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    regressions = stats.compare(results, stats.load(args.baseline), args.tolerance, args.min_delta_ms)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) against {args.baseline}:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print(f"\nNo regressions against {args.baseline} (tolerance {args.tolerance:.0%}).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+"""Drives the app in-process and collects per-endpoint figures for each scenario."""
+import asyncio
+import os
+import random
+import time
+
+import httpx
+from sqlalchemy import func
+
+from .. import models
+from ..database import SessionLocal
+from ..main import app
+from ..metrics import metrics
+from ..rollover import get_today_date
+from .scenarios import SCENARIOS
+from .stats import Recorder
+
+
+class BenchContext:
+    def __init__(self, client, employees, password, seed=42, reports_per_employee=10, polls=50):
+        self.client = client
+        self.employees = employees
+        self.password = password
+        self.rng = random.Random(seed)
+        self.reports_per_employee = reports_per_employee
+        self.polls = polls
+        self.today = get_today_date()
+        self.tokens = {}
+        self.admin_token = None
+        self.recorder = None
+
+    async def request(self, method, route, token=None, **kwargs):
+        headers = kwargs.pop("headers", None) or {}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        start = time.perf_counter()
+        resp = await self.client.request(method, route, headers=headers, **kwargs)
+        if self.recorder is not None:
+            self.recorder.record((method, route), time.perf_counter() - start, resp.status_code)
+        return resp
+
+    async def login(self, username, password, record=False):
+        recorder = self.recorder
+        if not record:
+            self.recorder = None
+        try:
+            resp = await self.request("POST", "/api/login", data={"username": username, "password": password})
+        finally:
+            self.recorder = recorder
+        if resp.status_code != 200:
+            raise RuntimeError(f"login failed for {username}: {resp.status_code} {resp.text[:200]}")
+        token = resp.json()["access_token"]
+        self.tokens[username] = token
+        return token
+
+
+def load_employees(prefix, limit):
+    """Synthetic employees (with at least one account) and their account ids."""
+    db = SessionLocal()
+    try:
+        rows = db.query(models.Employee.id, models.User.username)\
+            .join(models.User, models.User.id == models.Employee.user_id)\
+            .filter(models.User.username.like(f"{prefix}\\_emp%", escape="\\"))\
+            .join(models.InstagramAccount, models.InstagramAccount.assigned_employee_id == models.Employee.id)\
+            .group_by(models.Employee.id, models.User.username)\
+            .having(func.count(models.InstagramAccount.id) > 0)\
+            .order_by(models.Employee.id).limit(limit).all()
+        employees = []
+        for emp_id, username in rows:
+            accounts = [a for (a,) in db.query(models.InstagramAccount.id)
+                        .filter(models.InstagramAccount.assigned_employee_id == emp_id)
+                        .order_by(models.InstagramAccount.id).all()]
+            employees.append({"id": emp_id, "username": username, "accounts": accounts})
+        return employees
+    finally:
+        db.close()
+
+
+def _metrics_snapshot():
+    """(statement histograms, response bytes) per (method, route) from the metrics middleware."""
+    with metrics._lock:
+        return (
+            {key: (hist.total, hist.count) for key, hist in metrics.statements.items()},
+            dict(metrics.response_bytes),
+        )
+
+
+async def _drain(jobs, concurrency):
+    pending = iter(jobs)
+
+    async def worker():
+        for job in pending:
+            await job()
+
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+
+
+async def run_scenario(ctx, name, concurrency):
+    jobs = SCENARIOS[name](ctx)
+    ctx.recorder = Recorder()
+    before_statements, before_bytes = _metrics_snapshot()
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+    await _drain(jobs, concurrency)
+    wall = time.perf_counter() - start
+    # Process CPU: the app and the client share it, so this is a per-scenario figure
+    cpu = time.process_time() - cpu_start
+    after_statements, after_bytes = _metrics_snapshot()
+    ctx.recorder, recorder = None, ctx.recorder
+
+    statements = {}
+    for key, (total, count) in after_statements.items():
+        old_total, old_count = before_statements.get(key, (0, 0))
+        if count > old_count:
+            statements[key] = (total - old_total, count - old_count)
+    sizes = {key: size - before_bytes.get(key, 0) for key, size in after_bytes.items()}
+    requests = sum(len(v) for v in recorder.latencies.values())
+    print(f"  {name}: {requests} requests in {wall:.2f}s, {cpu:.2f}s CPU")
+    return recorder.summarize(wall, statements, sizes), recorder.cpu_summary(wall, cpu)
+
+
+async def run(scenarios, prefix="synth", users=50, concurrency=16, seed=42, reports_per_employee=10, polls=50):
+    employees = load_employees(prefix, users)
+    if not employees:
+        raise RuntimeError(f"no synthetic employees with prefix {prefix!r}; run with --generate first")
+
+    transport = httpx.ASGITransport(app=app)
+    # The lifespan runs the startup/shutdown hooks (audit writer, rollover scheduler) like uvicorn would
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            ctx = BenchContext(client, employees, "password", seed, reports_per_employee, polls)
+            ctx.admin_token = await ctx.login(os.getenv("ADMIN_USERNAME", "admin"), os.getenv("ADMIN_PASSWORD", "admin123"))
+            for emp in employees:
+                await ctx.login(emp["username"], ctx.password)
+
+            results = {"scenarios": {}, "cpu": {}}
+            for name in scenarios:
+                results["scenarios"][name], results["cpu"][name] = await run_scenario(ctx, name, concurrency)
+            return results
@@ -0,0 +1,103 @@
+"""Scripted request mixes. Each scenario returns a list of jobs (zero-arg coroutine
+factories) that the runner drains with a fixed number of concurrent workers."""
+from datetime import timedelta
+
+
+def login_storm(ctx):
+    """Morning open: every employee logs in and loads the dashboard."""
+    def job(emp):
+        async def run():
+            token = await ctx.login(emp["username"], ctx.password, record=True)
+            resp = await ctx.request("GET", "/api/employee/bootstrap", token=token)
+            # Second open of the page: revalidation should be a 304
+            etag = resp.headers.get("etag")
+            if etag:
+                await ctx.request("GET", "/api/employee/bootstrap", token=token, headers={"If-None-Match": etag})
+        return run
+    return [job(emp) for emp in ctx.employees]
+
+
+def report_submissions(ctx):
+    """Employees submit today's follower counts for their accounts."""
+    jobs = []
+    for emp in ctx.employees:
+        for account_id in emp["accounts"][:ctx.reports_per_employee]:
+            jobs.append(_submit(ctx, emp, account_id))
+    ctx.rng.shuffle(jobs)
+    return jobs
+
+
+def admin_polling(ctx):
+    """Admin screens refreshing the summary, download and report pages."""
+    today = ctx.today.isoformat()
+    jobs = []
+    for _ in range(ctx.polls):
+        jobs.append(_get(ctx, "/admin/daily-summary", admin=True))
+        jobs.append(_get(ctx, "/admin/download-stats", admin=True))
+        jobs.append(_get(ctx, "/admin/chart-data", admin=True))
+        jobs.append(_get(ctx, "/admin/all-reports", admin=True,
+                         params={"start_date": today, "end_date": today, "limit": 200}))
+    return jobs
+
+
+def large_lists(ctx):
+    """The big list responses: employee table, audit log pages, an employee's accounts."""
+    jobs = []
+    for i in range(ctx.polls):
+        emp = ctx.employees[i % len(ctx.employees)]
+        jobs.append(_get(ctx, "/admin/employees", admin=True))
+        jobs.append(_get(ctx, "/admin/logs", admin=True, params={"limit": 500}))
+        jobs.append(_get(ctx, "/api/employee/accounts", token=ctx.tokens[emp["username"]]))
+    return jobs
+
+
+def growth_analytics(ctx):
+    """Analytics reads: top movers over a week and a month, plus per-account series."""
+    week = {"start_date": (ctx.today - timedelta(days=6)).isoformat(), "end_date": ctx.today.isoformat()}
+    month = {"start_date": (ctx.today - timedelta(days=29)).isoformat(), "end_date": ctx.today.isoformat()}
+    jobs = []
+    for i in range(ctx.polls):
+        emp = ctx.employees[i % len(ctx.employees)]
+        jobs.append(_get(ctx, "/admin/analytics/growth", admin=True, params=dict(week, k=10)))
+        jobs.append(_get(ctx, "/admin/analytics/growth", admin=True, params=dict(month, k=10)))
+        jobs.append(_get(ctx, "/admin/analytics/series", admin=True, params=dict(month, account_id=emp["accounts"][0])))
+        jobs.append(_get(ctx, "/admin/analytics/series", admin=True, params=dict(month, employee_id=emp["id"])))
+    return jobs
+
+
+def mixed(ctx):
+    """Submissions with admin polling interleaved, so cache invalidation is exercised."""
+    submissions = report_submissions(ctx)
+    polls = admin_polling(ctx)
+    jobs = []
+    step = max(1, len(submissions) // max(1, len(polls)))
+    for i, job in enumerate(submissions):
+        jobs.append(job)
+        if i % step == 0 and polls:
+            jobs.append(polls.pop())
+    return jobs + polls
+
+
+def _submit(ctx, emp, account_id):
+    async def run():
+        await ctx.request(
+            "POST", "/employee/report", token=ctx.tokens[emp["username"]],
+            json={"instagram_account_id": account_id, "follower_count": ctx.rng.randint(100, 500000)},
+        )
+    return run
+
+
+def _get(ctx, route, admin=False, token=None, params=None):
+    async def run():
+        await ctx.request("GET", route, token=ctx.admin_token if admin else token, params=params)
+    return run
+
+
+SCENARIOS = {
+    "login_storm": login_storm,
+    "report_submissions": report_submissions,
+    "admin_polling": admin_polling,
+    "large_lists": large_lists,
+    "growth_analytics": growth_analytics,
+    "mixed": mixed,
+}
@@ -0,0 +1,124 @@
+"""Per-endpoint result aggregation and baseline comparison."""
+import json
+import math
+from collections import defaultdict
+
+# Higher is worse for these; throughput is the only "higher is better" figure
+LOWER_IS_BETTER = ("p50_ms", "p95_ms", "p99_ms", "sql_statements", "bytes_per_response")
+
+
+def is_error(status):
+    """4xx/5xx; 304 Not Modified is a normal answer to a conditional request."""
+    return int(status) >= 400
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def record(self, key, seconds, status):
+        self.latencies[key].append(seconds)
+        self.statuses[key][status] += 1
+
+    def summarize(self, wall_seconds, statements, sizes=None):
+        """statements: {(method, route): (total, count)}, sizes: {(method, route): bytes sent},
+        both observed by the metrics middleware (sizes are after compression)."""
+        out = {}
+        sizes = sizes or {}
+        for key, values in sorted(self.latencies.items()):
+            values.sort()
+            total, count = statements.get(key, (0, 0))
+            size = sizes.get(key, 0)
+            out[f"{key[0]} {key[1]}"] = {
+                "requests": len(values),
+                "throughput_rps": round(len(values) / wall_seconds, 2) if wall_seconds else 0.0,
+                "p50_ms": round(percentile(values, 50) * 1000, 3),
+                "p95_ms": round(percentile(values, 95) * 1000, 3),
+                "p99_ms": round(percentile(values, 99) * 1000, 3),
+                "sql_statements": round(total / count, 2) if count else 0.0,
+                "bytes_per_response": round(size / len(values)) if values else 0,
+                "bytes_per_s": round(size / wall_seconds) if wall_seconds else 0,
+                "errors": sum(n for status, n in self.statuses[key].items() if is_error(status)),
+                "statuses": {str(k): v for k, v in sorted(self.statuses[key].items())},
+            }
+        return out
+
+    def cpu_summary(self, wall_seconds, cpu_seconds):
+        requests = sum(len(v) for v in self.latencies.values())
+        return {
+            "requests": requests,
+            "cpu_s": round(cpu_seconds, 3),
+            "cpu_ms_per_request": round(cpu_seconds * 1000 / requests, 3) if requests else 0.0,
+            "cpu_utilization": round(cpu_seconds / wall_seconds, 3) if wall_seconds else 0.0,
+        }
+
+
+def compare(results, baseline, tolerance=0.2, min_delta_ms=2.0):
+    """Returns a list of human-readable regressions of results against baseline.
+
+    A figure regresses when it is worse by more than `tolerance` (relative);
+    latency additionally needs to be worse by `min_delta_ms`, so sub-millisecond
+    noise on cheap endpoints does not fail the run. SQL statement counts are
+    deterministic, so any increase beyond the tolerance counts. Any increase in
+    4xx/5xx responses is a regression too: an endpoint that starts failing fast
+    would otherwise look like a speed-up.
+    """
+    regressions = []
+    for scenario, endpoints in results.get("scenarios", {}).items():
+        base_endpoints = baseline.get("scenarios", {}).get(scenario, {})
+        for endpoint, cur in endpoints.items():
+            old, new = base_endpoints.get(endpoint, {}).get("errors", 0), cur.get("errors", 0)
+            if new > old:
+                regressions.append(f"{scenario} {endpoint}: errors {old} -> {new} (statuses {cur.get('statuses')})")
+    for scenario, endpoints in baseline.get("scenarios", {}).items():
+        current_endpoints = results.get("scenarios", {}).get(scenario)
+        if current_endpoints is None:
+            regressions.append(f"{scenario}: scenario missing from results")
+            continue
+        for endpoint, base in endpoints.items():
+            cur = current_endpoints.get(endpoint)
+            if cur is None:
+                regressions.append(f"{scenario} {endpoint}: endpoint missing from results")
+                continue
+            for field in LOWER_IS_BETTER:
+                if field not in base:
+                    # Baseline written before this figure existed
+                    continue
+                old, new = base[field], cur.get(field, 0)
+                limit = old * (1 + tolerance)
+                if field.endswith("_ms"):
+                    limit = max(limit, old + min_delta_ms)
+                if new > limit:
+                    regressions.append(f"{scenario} {endpoint}: {field} {old} -> {new}")
+            old, new = base.get("throughput_rps", 0), cur.get("throughput_rps", 0)
+            if old and new < old * (1 - tolerance):
+                regressions.append(f"{scenario} {endpoint}: throughput_rps {old} -> {new}")
+    # CPU is per scenario (app and client share the process); baselines without it are skipped
+    for scenario, base in baseline.get("cpu", {}).items():
+        cur = results.get("cpu", {}).get(scenario)
+        if cur is None:
+            continue
+        old, new = base.get("cpu_ms_per_request", 0), cur.get("cpu_ms_per_request", 0)
+        if new > max(old * (1 + tolerance), old + min_delta_ms):
+            regressions.append(f"{scenario}: cpu_ms_per_request {old} -> {new}")
+    return regressions
+
+
+def load(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write("\n")
@@ -0,0 +1,138 @@
+"""Write-invalidated response cache for the admin dashboards.
+
+Write paths call `bump(...)` for the tables they change; a cached response is
+reused while the versions of every table it was built from are unchanged.
+Versions are per process, so entries also expire after RESPONSE_CACHE_MAX_AGE
+seconds to bound staleness when several workers run.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from fastapi.responses import Response
+
+from . import fastjson
+
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", 256))
+RESPONSE_CACHE_MAX_AGE = float(os.getenv("RESPONSE_CACHE_MAX_AGE", 30))
+
+# Logical tables the cached endpoints read
+REPORTS = "reports"
+DOWNLOADS = "downloads"
+EMPLOYEES = "employees"
+ACCOUNTS = "accounts"
+NOTES = "notes"
+
+
+class TableVersions:
+    def __init__(self):
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def bump(self, *tables):
+        with self._lock:
+            for t in tables:
+                self._versions[t] = self._versions.get(t, 0) + 1
+
+    def snapshot(self, tables):
+        with self._lock:
+            return tuple(self._versions.get(t, 0) for t in tables)
+
+
+def encode_json(payload) -> bytes:
+    return fastjson.dumps(payload)
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+
+def etag_matches(request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    return etag in [t.strip().replace("W/", "", 1) for t in header.split(",")] or header.strip() == "*"
+
+
+def json_response(request, body: bytes, etag: str, variants=None) -> Response:
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return fastjson.json_bytes_response(request, body, headers=headers, variants=variants)
+
+
+class ResponseCache:
+    def __init__(self, versions: TableVersions, max_size=RESPONSE_CACHE_SIZE, max_age=RESPONSE_CACHE_MAX_AGE):
+        self.versions = versions
+        self.max_size = max_size
+        self.max_age = max_age
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.not_modified = 0
+
+    def _get(self, key, versions):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == versions and entry[1] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2], entry[3], entry[4]
+            self.misses += 1
+            return None
+
+    def _put(self, key, versions, body, etag, variants):
+        with self._lock:
+            self._entries[key] = (versions, time.monotonic() + self.max_age, body, etag, variants)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def respond(self, request, key, tables, compute, encode=encode_json) -> Response:
+        """Serves `compute()` for `key` from cache while `tables` are unchanged, with ETag/304."""
+        # Snapshot before computing: a write during compute makes the entry stale, not wrong
+        versions = self.versions.snapshot(tables)
+        cached = self._get(key, versions)
+        if cached is None:
+            body = encode(compute())
+            etag = make_etag(body)
+            # Compressed copies of body by Content-Encoding, filled on first use
+            variants = {}
+            self._put(key, versions, body, etag, variants)
+        else:
+            body, etag, variants = cached
+
+        response = json_response(request, body, etag, variants)
+        if response.status_code == 304:
+            with self._lock:
+                self.not_modified += 1
+        return response
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "not_modified": self.not_modified,
+            }
+
+
+table_versions = TableVersions()
+response_cache = ResponseCache(table_versions)
+
+def bump(*tables):
+    table_versions.bump(*tables)
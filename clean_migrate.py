@@ -1,9 +1,8 @@
-from .database import engine
-from . import models
+from .migrations import run_migrations
 
 def migrate():
     print("Running migrations...")
-    models.Base.metadata.create_all(bind=engine)
+    run_migrations()
     print("Migrations complete.")
 
 if __name__ == "__main__":
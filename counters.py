@@ -0,0 +1,108 @@
+"""Denormalized per-employee counters: Employee.assigned_count and Employee.total_downloads.
+
+Every write path that assigns/unassigns accounts or adds download records
+adjusts the counters with `col = col + delta` in the same transaction, so
+quota checks and totals are single-row reads. `reconcile` recomputes them
+from instagram_accounts / download_records and reports any drift.
+
+Usage:
+    python -m backend.counters           report drift and fix it
+    python -m backend.counters --check   report only (exit 1 on drift)
+"""
+import sys
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from . import models
+from .database import SessionLocal
+
+E = models.Employee.__table__
+IA = models.InstagramAccount.__table__
+DR = models.DownloadRecord.__table__
+
+
+def adjust_assigned(db: Session, employee_id, delta: int):
+    """assigned_count += delta. Does not commit."""
+    if employee_id is None or not delta:
+        return
+    db.execute(update(E).where(E.c.id == employee_id).values(assigned_count=func.coalesce(E.c.assigned_count, 0) + delta))
+
+
+def reserve_assigned(db: Session, employee_id: int, n: int) -> bool:
+    """Atomically adds n to assigned_count if it stays within account_quota. Does not commit.
+
+    The check and the increment are one UPDATE, so two concurrent pastes can't
+    both squeeze under the quota; rolling back the transaction releases the room.
+    """
+    new_count = func.coalesce(E.c.assigned_count, 0) + n
+    result = db.execute(
+        update(E).where(E.c.id == employee_id, new_count <= func.coalesce(E.c.account_quota, 0))
+        .values(assigned_count=new_count)
+    )
+    return result.rowcount == 1
+
+
+def adjust_downloads(db: Session, employee_id, delta: int):
+    """total_downloads += delta. Does not commit."""
+    if employee_id is None or not delta:
+        return
+    db.execute(update(E).where(E.c.id == employee_id).values(total_downloads=func.coalesce(E.c.total_downloads, 0) + delta))
+
+
+def _actual_assigned():
+    return select(func.count(IA.c.id)).where(IA.c.assigned_employee_id == E.c.id).scalar_subquery()
+
+
+def _actual_downloads():
+    return select(func.coalesce(func.sum(DR.c.count), 0)).where(DR.c.employee_id == E.c.id).scalar_subquery()
+
+
+def recompute(conn, employee_ids=None):
+    """Sets both counters from the source tables in one correlated UPDATE (Session or Connection)."""
+    stmt = update(E).values(assigned_count=_actual_assigned(), total_downloads=_actual_downloads())
+    if employee_ids is not None:
+        stmt = stmt.where(E.c.id.in_(list(employee_ids)))
+    return conn.execute(stmt).rowcount
+
+
+def find_drift(db: Session):
+    """[{"employee_id", "field", "stored", "actual"}] for every counter that disagrees."""
+    rows = db.execute(select(
+        E.c.id, E.c.assigned_count, _actual_assigned(), E.c.total_downloads, _actual_downloads()
+    ).order_by(E.c.id)).all()
+    drift = []
+    for emp_id, stored_assigned, actual_assigned, stored_downloads, actual_downloads in rows:
+        if stored_assigned != (actual_assigned or 0):
+            drift.append({"employee_id": emp_id, "field": "assigned_count", "stored": stored_assigned, "actual": actual_assigned or 0})
+        if stored_downloads != (actual_downloads or 0):
+            drift.append({"employee_id": emp_id, "field": "total_downloads", "stored": stored_downloads, "actual": actual_downloads or 0})
+    return drift
+
+
+def reconcile(db: Session, fix: bool = True):
+    """Reports drift and, with fix=True, recomputes the drifted employees. Returns the drift list."""
+    drift = find_drift(db)
+    if fix and drift:
+        # Recomputed in SQL rather than from the values read above, so writes in between aren't lost
+        recompute(db, {d["employee_id"] for d in drift})
+        db.commit()
+    return drift
+
+
+if __name__ == "__main__":
+    check_only = "--check" in sys.argv
+    db = SessionLocal()
+    try:
+        drift = reconcile(db, fix=not check_only)
+    finally:
+        db.close()
+    for d in drift:
+        print(f"employee {d['employee_id']}: {d['field']} stored={d['stored']} actual={d['actual']}")
+    if not drift:
+        print("Counters are consistent.")
+    elif check_only:
+        print(f"{len(drift)} counter(s) drifted.")
+        sys.exit(1)
+    else:
+        print(f"Fixed {len(drift)} drifted counter(s).")
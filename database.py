@@ -1,5 +1,8 @@
 import os
-from sqlalchemy import create_engine
+import threading
+import time
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
@@ -14,18 +17,168 @@ if DATABASE_URL and DATABASE_URL.startswith("postgres://"):
 if not DATABASE_URL:
     DATABASE_URL = "sqlite:///./social_media.db"
 
-if DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-else:
-    engine = create_engine(DATABASE_URL)
+# Async mode is opt-in: an async driver in DATABASE_URL (sqlite+aiosqlite://, postgresql+asyncpg://)
+# or DATABASE_ASYNC=1 for URLs we can't control (Render's connectionString).
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+if os.getenv("DATABASE_ASYNC") == "1":
+    for sync_prefix, async_prefix in ASYNC_DRIVERS.items():
+        if DATABASE_URL.startswith(sync_prefix + ":"):
+            DATABASE_URL = DATABASE_URL.replace(sync_prefix, async_prefix, 1)
+
+ASYNC_DB = any(DATABASE_URL.startswith(p + ":") for p in ASYNC_DRIVERS.values())
+
+# The sync engine always exists (scripts, background workers, non-hot endpoints)
+SYNC_DATABASE_URL = DATABASE_URL
+for sync_prefix, async_prefix in ASYNC_DRIVERS.items():
+    if SYNC_DATABASE_URL.startswith(async_prefix + ":"):
+        SYNC_DATABASE_URL = SYNC_DATABASE_URL.replace(async_prefix, sync_prefix, 1)
+
+# --- Database profile ---
+
+# SQLite: applied to every new connection
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", 65536))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", 268435456))
+
+# Server databases (and file SQLite): size against uvicorn workers x threadpool size
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+
+IS_SQLITE = SYNC_DATABASE_URL.startswith("sqlite")
+IS_SQLITE_MEMORY = IS_SQLITE and (":memory:" in SYNC_DATABASE_URL or SYNC_DATABASE_URL.rstrip("/") == "sqlite:")
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait for a free connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._wait_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except Exception:
+            with self._wait_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            with self._wait_lock:
+                self.checkouts += 1
+                self.total_wait += waited
+                self.max_wait = max(self.max_wait, waited)
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    # Negative cache_size is in KiB
+    cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+def _engine_options(is_async=False):
+    if IS_SQLITE:
+        options = {"connect_args": {"check_same_thread": False}}
+        if IS_SQLITE_MEMORY:
+            return options
+    else:
+        options = {"pool_pre_ping": True}
+    options.update(
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+    )
+    if not is_async:
+        options["poolclass"] = TimedQueuePool
+    return options
+
+
+engine = create_engine(SYNC_DATABASE_URL, **_engine_options())
+
+if IS_SQLITE and not IS_SQLITE_MEMORY:
+    event.listen(engine, "connect", _apply_sqlite_pragmas)
+
+
+def pool_stats():
+    """Live pool numbers for sizing the pool against the number of workers."""
+    pool = engine.pool
+    if not isinstance(pool, QueuePool):
+        return {"pool": type(pool).__name__}
+    stats = {
+        "pool": type(pool).__name__,
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "max_overflow": DB_MAX_OVERFLOW,
+    }
+    if isinstance(pool, TimedQueuePool):
+        with pool._wait_lock:
+            stats.update({
+                "checkouts": pool.checkouts,
+                "timeouts": pool.timeouts,
+                "avg_wait_ms": round(pool.total_wait / pool.checkouts * 1000, 3) if pool.checkouts else 0.0,
+                "max_wait_ms": round(pool.max_wait * 1000, 3),
+            })
+    return stats
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = None
+AsyncSessionLocal = None
+
+if ASYNC_DB:
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+    async_engine = create_async_engine(DATABASE_URL, **_engine_options(is_async=True))
+    if IS_SQLITE and not IS_SQLITE_MEMORY:
+        event.listen(async_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+    AsyncSessionLocal = sessionmaker(
+        bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+    )
+
+# Slow statements (over SLOW_QUERY_MS) with their plans, see /admin/slow-queries
+from .slowlog import slow_query_log
+
+slow_query_log.install(engine)
+if async_engine is not None:
+    slow_query_log.install(async_engine.sync_engine)
+
 Base = declarative_base()
 
+def get_dialect_insert(db):
+    """Returns the dialect specific insert() (with ON CONFLICT support) or None."""
+    name = db.get_bind().dialect.name
+    if name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    if name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    return None
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,116 @@
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from . import counters
+from . import models
+
+MODES = ("fill", "round_robin", "weighted")
+
+
+def count_unassigned(db: Session) -> int:
+    return db.query(func.count(models.InstagramAccount.id)).filter(
+        models.InstagramAccount.assigned_employee_id == None
+    ).scalar() or 0
+
+
+def claim_accounts(db: Session, employee_id: int, n: int, count_assigned: bool = True) -> int:
+    """Assigns up to n unassigned accounts to employee_id in one UPDATE. Does not commit.
+
+    The id subquery and the outer `assigned_employee_id IS NULL` guard make the claim
+    atomic: a concurrent call can never take the same rows. On Postgres the subquery
+    also uses FOR UPDATE SKIP LOCKED so concurrent claims skip each other's rows
+    instead of waiting and coming back short.
+    """
+    if n <= 0:
+        return 0
+    IA = models.InstagramAccount
+    ids = select(IA.id).where(IA.assigned_employee_id == None).order_by(IA.id).limit(n)
+    if db.get_bind().dialect.name == "postgresql":
+        ids = ids.with_for_update(skip_locked=True)
+
+    stmt = update(IA).where(
+        IA.id.in_(ids),
+        IA.assigned_employee_id == None
+    ).values(assigned_employee_id=employee_id).execution_options(synchronize_session=False)
+    claimed = db.execute(stmt).rowcount
+    if count_assigned:
+        counters.adjust_assigned(db, employee_id, claimed)
+    return claimed
+
+
+def _room(db: Session, employee_id: int) -> int:
+    quota, assigned = db.query(models.Employee.account_quota, models.Employee.assigned_count)\
+        .filter(models.Employee.id == employee_id).one()
+    return max(0, (quota or 0) - (assigned or 0))
+
+
+def claim_within_quota(db: Session, employee_id: int, n: int, attempts: int = 3) -> int:
+    """Claims up to n accounts without taking employee_id past account_quota. Does not commit.
+
+    The room fill mode plans with is an unlocked read, so two fill requests can both
+    see it. The counter is reserved first with the conditional UPDATE of
+    counters.reserve_assigned; if that fails the request shrinks to the room left now.
+    """
+    while n > 0 and not counters.reserve_assigned(db, employee_id, n):
+        attempts -= 1
+        n = _room(db, employee_id) if attempts > 0 else 0
+    if n <= 0:
+        return 0
+    claimed = claim_accounts(db, employee_id, n, count_assigned=False)
+    if claimed < n:
+        # Fewer unassigned accounts than planned: hand back the unused reservation
+        counters.adjust_assigned(db, employee_id, claimed - n)
+    return claimed
+
+
+def _split(total: int, weights):
+    """Largest-remainder split of total by weights (list of non-negative numbers)."""
+    weight_sum = sum(weights)
+    if total <= 0 or weight_sum <= 0:
+        return [0] * len(weights)
+    exact = [total * w / weight_sum for w in weights]
+    shares = [int(x) for x in exact]
+    order = sorted(range(len(weights)), key=lambda i: exact[i] - shares[i], reverse=True)
+    for i in order[:total - sum(shares)]:
+        shares[i] += 1
+    return shares
+
+
+def plan_distribution(db: Session, employee_ids, mode: str, available: int, limit=None, weights=None):
+    """Returns {employee_id: number of accounts to hand out}."""
+    if mode == "fill":
+        # Fill each employee up to their account_quota, in the given order
+        rows = db.query(
+            models.Employee.id,
+            models.Employee.account_quota,
+            models.Employee.assigned_count
+        ).filter(models.Employee.id.in_(employee_ids)).all()
+        room = {emp_id: max(0, (quota or 0) - (assigned or 0)) for emp_id, quota, assigned in rows}
+
+        budget = available if limit is None else min(available, limit)
+        plan = {}
+        for emp_id in employee_ids:
+            n = min(room.get(emp_id, 0), budget)
+            plan[emp_id] = n
+            budget -= n
+        return plan
+
+    total = available if limit is None else min(available, limit)
+    if mode == "weighted":
+        shares = _split(total, [max(0, (weights or {}).get(emp_id, 0)) for emp_id in employee_ids])
+    else:
+        # round_robin: even split, remainder to the first employees
+        shares = _split(total, [1] * len(employee_ids))
+    return dict(zip(employee_ids, shares))
+
+
+def distribute(db: Session, employee_ids, mode: str, limit=None, weights=None):
+    """Plans and claims in one transaction. Returns {employee_id: accounts claimed}."""
+    available = count_unassigned(db)
+    plan = plan_distribution(db, employee_ids, mode, available, limit, weights)
+    claim = claim_within_quota if mode == "fill" else claim_accounts
+    claimed = {}
+    for emp_id, n in plan.items():
+        claimed[emp_id] = claim(db, emp_id, n)
+    db.commit()
+    return claimed
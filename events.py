@@ -0,0 +1,146 @@
+"""Server-Sent Events broker for the live admin summary.
+
+Write paths (sync endpoints, the rollover thread, async routes) call `publish()`;
+the broker hands each event to every subscriber's bounded asyncio queue on the
+event loop. A subscriber that falls behind gets its buffer replaced by a single
+"resync" event telling the page to reload the snapshot.
+"""
+import asyncio
+import json
+import os
+import threading
+
+from fastapi.encoders import jsonable_encoder
+
+SSE_BUFFER_SIZE = int(os.getenv("SSE_BUFFER_SIZE", 100))
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", 15))
+
+_CLOSE = None
+
+
+def format_event(event: str, data, event_id=None) -> str:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append("data: " + json.dumps(jsonable_encoder(data), separators=(",", ":")))
+    return "\n".join(lines) + "\n\n"
+
+
+class Subscriber:
+    __slots__ = ("queue", "lagged")
+
+    def __init__(self, size):
+        self.queue = asyncio.Queue(maxsize=size)
+        self.lagged = 0
+
+
+class EventBroker:
+    def __init__(self, buffer_size=SSE_BUFFER_SIZE):
+        self.buffer_size = buffer_size
+        self._subscribers = set()
+        self._loop = None
+        self._lock = threading.Lock()
+        self._seq = 0
+        self.published = 0
+        self.dropped = 0
+
+    @property
+    def active(self) -> bool:
+        """True while at least one client is connected (lets callers skip building events)."""
+        return bool(self._subscribers)
+
+    def subscribe(self) -> Subscriber:
+        """Must be called on the event loop."""
+        self._loop = asyncio.get_running_loop()
+        sub = Subscriber(self.buffer_size)
+        self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscriber):
+        self._subscribers.discard(sub)
+
+    def publish(self, event: str, data):
+        """Thread-safe; a no-op when nobody is listening."""
+        loop = self._loop
+        if loop is None or not self.active or loop.is_closed():
+            return
+        with self._lock:
+            self._seq += 1
+            self.published += 1
+            message = format_event(event, data, self._seq)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._deliver(message)
+        else:
+            loop.call_soon_threadsafe(self._deliver, message)
+
+    def _deliver(self, message):
+        for sub in list(self._subscribers):
+            try:
+                sub.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Too far behind: drop the backlog, ask the client to reload the snapshot
+                self.dropped += sub.queue.qsize()
+                sub.lagged += 1
+                while not sub.queue.empty():
+                    sub.queue.get_nowait()
+                sub.queue.put_nowait(format_event("resync", {}))
+
+    def close(self):
+        """Ends every open stream (used on shutdown)."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        loop.call_soon_threadsafe(self._close_all)
+
+    def _close_all(self):
+        for sub in list(self._subscribers):
+            while not sub.queue.empty():
+                sub.queue.get_nowait()
+            sub.queue.put_nowait(_CLOSE)
+
+    async def stream(self, request, sub: Subscriber, snapshot):
+        """Yields the snapshot, then deltas, with heartbeats while idle."""
+        try:
+            yield format_event("snapshot", snapshot)
+            while True:
+                try:
+                    message = await asyncio.wait_for(sub.queue.get(), timeout=SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        break
+                    yield ": heartbeat\n\n"
+                    continue
+                if message is _CLOSE:
+                    break
+                yield message
+        finally:
+            self.unsubscribe(sub)
+
+    def stats(self):
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "dropped": self.dropped,
+        }
+
+
+event_broker = EventBroker()
+
+
+def report_event(status: str, report_date, employee_id: int, employee_name: str, account_id: int, account: str, count: int):
+    """Payload of a "report" event; matches a row of the daily-summary `reports` list plus ids."""
+    return {
+        "status": status,
+        "date": str(report_date),
+        "employee_id": employee_id,
+        "employee_name": employee_name,
+        "account_id": account_id,
+        "account": account,
+        "count": count,
+        "locked": False,
+    }
@@ -0,0 +1,90 @@
+"""High-throughput JSON responses for large list endpoints.
+
+Rows are projected straight from SQL and encoded with orjson when it is
+installed (plain json otherwise), skipping response_model validation.
+Bodies over COMPRESS_MIN_SIZE are compressed with br (if `brotli` is
+installed) or gzip, depending on Accept-Encoding. Callers that reuse a body
+(the response cache) pass a `variants` dict so each encoding is compressed
+once. Endpoints keep their response_model so the OpenAPI schema does not change.
+"""
+import gzip
+import json
+import os
+from datetime import date, datetime
+from decimal import Decimal
+
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", 8192))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", 5))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", 4))
+
+
+def _default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(payload) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(payload, default=_default)
+    return json.dumps(payload, default=_default, separators=(",", ":")).encode("utf-8")
+
+
+def negotiate_encoding(request):
+    accepted = set()
+    for part in request.headers.get("accept-encoding", "").split(","):
+        token, _, params = part.strip().partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0"):
+            continue
+        accepted.add(token.strip().lower())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+def json_bytes_response(request, body: bytes, status_code: int = 200, headers=None, variants=None) -> Response:
+    """Sends an already encoded JSON body, compressed when large enough and accepted.
+
+    variants: optional {encoding: compressed body} kept by the caller next to `body`;
+    a missing encoding is compressed here and stored in it for the next request.
+    """
+    headers = dict(headers or {})
+    if len(body) >= COMPRESS_MIN_SIZE:
+        headers["Vary"] = "Accept-Encoding"
+        encoding = negotiate_encoding(request)
+        if encoding:
+            compressed = variants.get(encoding) if variants is not None else None
+            if compressed is None:
+                compressed = compress(body, encoding)
+                if variants is not None:
+                    # Two requests racing here both compress; either result is the same bytes
+                    variants[encoding] = compressed
+            body = compressed
+            headers["Content-Encoding"] = encoding
+    return Response(content=body, status_code=status_code, media_type="application/json", headers=headers)
+
+
+def fast_json(request, payload, status_code: int = 200, headers=None) -> Response:
+    return json_bytes_response(request, dumps(payload), status_code, headers)
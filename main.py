@@ -1,25 +1,64 @@
 
-from fastapi import FastAPI, Depends, HTTPException, status, Body, APIRouter
+from fastapi import FastAPI, Depends, HTTPException, status, APIRouter
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import func, and_, or_, literal, select
 from typing import List, Optional
 from datetime import datetime, timedelta, date
-import pytz
 from pydantic import BaseModel
 import os
+import shutil
+import tempfile
 
 from . import models
-from .database import engine, get_db
+from .database import engine, async_engine, SessionLocal, get_db, get_dialect_insert, pool_stats, ASYNC_DB
 from . import auth
+from . import rollups
+from . import pagination
+from . import account_import
+from . import distribution
+from . import counters
+from . import analytics
+from . import cache
+from . import fastjson
+from . import metrics
+from .slowlog import slow_query_log
+from .cache import response_cache
+from . import events
+from .events import event_broker
+from .audit import audit_writer
+from .schemas import (
+    EmployeeCreate,
+    InstagramAccountCreate,
+    QuotaRequest,
+    BulkAccountCreate,
+    AssignRequest,
+    ReportCreate,
+    Token,
+    AccountOut,
+    EmployeeDashboardData,
+    EmployeeOut,
+    EmployeeDetailOut,
+)
+from .rollover import get_today_date, is_report_locked, rollover_scheduler
+from .migrations import run_migrations
 
 # Create tables if not exist (handled by seed, but good safety)
 models.Base.metadata.create_all(bind=engine)
 # 18. satırdan sonra buraya yapıştır:
 app = FastAPI()
 
+# Times every request and counts its SQL statements (per-route histograms at /admin/metrics)
+app.add_middleware(metrics.MetricsMiddleware)
+metrics.instrument_engine(engine)
+if async_engine is not None:
+    metrics.instrument_engine(async_engine.sync_engine)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -29,103 +68,59 @@ app.add_middleware(
 )
 api_router = APIRouter(prefix="/api")
 
-ISTANBUL_TZ = pytz.timezone("Europe/Istanbul")
-
-# --- Pydantic Models ---
-
-class EmployeeCreate(BaseModel):
-    username: str
-    password: str
-    full_name: str
-    role: str = "employee"
-
-class InstagramAccountCreate(BaseModel):
-    username: str
-    password: str
-
-class QuotaRequest(BaseModel):
-    employee_id: int
-    amount: int
-
-class BulkAccountCreate(BaseModel):
-    accounts: List[InstagramAccountCreate]
-
-class AssignRequest(BaseModel):
-    employee_id: int
-    limit: Optional[int] = 10
+if ASYNC_DB:
+    # Async versions of the hot endpoints; included first so they win over the sync ones below
+    from .async_routes import router as async_router
+    app.include_router(async_router)
 
-class ReportCreate(BaseModel):
-    instagram_account_id: int
-    follower_count: int
+# Older databases get new columns (e.g. employees.assigned_count) before the first request.
+# start.sh / Procfile also run `python -m backend.clean_migrate`; then this is a no-op.
+MIGRATE_ON_STARTUP = os.getenv("MIGRATE_ON_STARTUP", "1") == "1"
 
-class Token(BaseModel):
-    access_token: str
-    token_type: str
-    role: str
+@app.on_event("startup")
+def apply_pending_migrations():
+    if not MIGRATE_ON_STARTUP:
+        return
+    try:
+        run_migrations()
+    except Exception as e:
+        # Another worker may be applying the same version at the same time
+        print(f"Startup migration error: {e}")
 
-class AccountOut(BaseModel):
-    id: int
-    username: str
-    
-    class Config:
-        orm_mode = True
+@app.on_event("startup")
+def start_background_workers():
+    audit_writer.start()
+    rollover_scheduler.start()
 
-class AccountWithPasswordOut(BaseModel):
-    id: int
-    username: str
-    password: str
-    
-    class Config:
-        orm_mode = True
-
-class EmployeeDashboardData(BaseModel):
-    quota: int
-    assigned_accounts: List[AccountWithPasswordOut]
-
-class EmployeeOut(BaseModel):
-    id: int
-    full_name: str
-    user_name: str
-    visible_password: Optional[str] = None
-    account_quota: int = 0
-    assigned_count: int = 0
-
-class EmployeeDetailOut(BaseModel):
-    id: int
-    full_name: str
-    user_name: str
-    assigned_accounts: List[AccountWithPasswordOut]
-
-class ReportOut(BaseModel):
-    id: int
-    employee_id: int
-    instagram_account_id: int
-    date: str
-    follower_count: int
-    locked: bool
-    account_username: str
-    employee_name: str
+@app.on_event("shutdown")
+def stop_background_workers():
+    rollover_scheduler.stop()
+    event_broker.close()
+    # Flush pending audit events before exit
+    audit_writer.stop()
 
 # --- Helpers ---
 
-def get_today_date():
-    return datetime.now(ISTANBUL_TZ).date()
+# get_today_date / lock_past_reports live in rollover.py; past days are locked
+# once at Istanbul midnight by the rollover scheduler, not on every request.
 
-def lock_past_reports(db: Session):
-    """Locks any unlocked report that is not from today."""
-    today = get_today_date()
-    # Find records where date < today and locked=False
-    db.query(models.DailyReport).filter(
-        models.DailyReport.date < today,
-        models.DailyReport.locked == False
-    ).update({models.DailyReport.locked: True}, synchronize_session=False)
-    db.commit()
+def get_current_employee(db: Session, current_user: auth.Principal):
+    emp = None
+    if current_user.employee_id is not None:
+        emp = db.query(models.Employee).filter(models.Employee.id == current_user.employee_id).first()
+    if not emp:
+        raise HTTPException(status_code=404, detail="Employee not found")
+    return emp
 
 # --- Auth ---
 
-from fastapi import Request
+from fastapi import Request, Response, UploadFile, File, Form
 
 def create_audit_log(db: Session, user_id: int, action: str, details: str, ip: str):
+    # Hand the event to the background writer; write inline only when it is not running
+    if audit_writer.running:
+        audit_writer.enqueue(user_id, action, details, ip)
+        return
     try:
         log = models.AuditLog(user_id=user_id, action=action, details=details, ip_address=ip)
         db.add(log)
@@ -136,7 +131,7 @@ def create_audit_log(db: Session, user_id: int, action: str, details: str, ip: s
 @api_router.post("/login", response_model=Token)
 async def login_for_access_token(request: Request, form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     user = db.query(models.User).filter(models.User.username == form_data.username).first()
-    if not user or not auth.verify_password(form_data.password, user.password_hash):
+    if not user or not await auth.verify_password_async(form_data.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -155,13 +150,13 @@ async def login_for_access_token(request: Request, form_data: OAuth2PasswordRequ
 # --- Admin Endpoints ---
 
 @app.post("/admin/create-employee")
-def create_employee(emp: EmployeeCreate, db: Session = Depends(get_db), current_user: models.User = Depends(auth.get_current_active_admin)):
+def create_employee(emp: EmployeeCreate, db: Session = Depends(get_db), current_user: auth.Principal = Depends(auth.get_current_active_admin)):
     # Check if user exists
     if db.query(models.User).filter(models.User.username == emp.username).first():
         raise HTTPException(status_code=400, detail="Username already registered")
     
     # Create User
-    hashed_pwd = auth.get_password_hash(emp.password)
+    hashed_pwd = auth.hash_password_bounded(emp.password)
     db_user = models.User(username=emp.username, password_hash=hashed_pwd, role=emp.role)
     db.add(db_user)
     db.commit()
@@ -176,7 +171,9 @@ def create_employee(emp: EmployeeCreate, db: Session = Depends(get_db), current_
         )
         db.add(db_emp)
         db.commit()
-    
+        cache.bump(cache.EMPLOYEES)
+
+    auth.principal_cache.invalidate_user(username=emp.username)
     return {"status": "success", "msg": "User created"}
 
 class ResetPasswordRequest(BaseModel):
@@ -184,7 +181,7 @@ class ResetPasswordRequest(BaseModel):
     new_password: str
 
 @app.post("/admin/reset-password")
-def reset_password(req: ResetPasswordRequest, db: Session = Depends(get_db), current_user: models.User = Depends(auth.get_current_active_admin)):
+def reset_password(req: ResetPasswordRequest, db: Session = Depends(get_db), current_user: auth.Principal = Depends(auth.get_current_active_admin)):
     emp = db.query(models.Employee).filter(models.Employee.id == req.employee_id).first()
     if not emp:
         raise HTTPException(status_code=404, detail="Employee not found")
@@ -193,14 +190,16 @@ def reset_password(req: ResetPasswordRequest, db: Session = Depends(get_db), cur
     if not user:
         raise HTTPException(status_code=404, detail="User account not found")
         
-    user.password_hash = auth.get_password_hash(req.new_password)
+    user.password_hash = auth.hash_password_bounded(req.new_password)
     emp.visible_password = req.new_password # Update visible
     db.commit()
+    cache.bump(cache.EMPLOYEES)
+    auth.principal_cache.invalidate_user(user_id=user.id)
     return {"status": "success", "msg": "Password updated"}
 
 
 @app.delete("/admin/delete-employee/{id}")
-def delete_employee(id: int, db: Session = Depends(get_db), current_user: models.User = Depends(auth.get_current_active_admin)):
+def delete_employee(id: int, db: Session = Depends(get_db), current_user: auth.Principal = Depends(auth.get_current_active_admin)):
     params_emp_id = id # rename to avoid shadowing built-in id
     
     emp = db.query(models.Employee).filter(models.Employee.id == params_emp_id).first()
@@ -212,6 +211,18 @@ def delete_employee(id: int, db: Session = Depends(get_db), current_user: models
         {models.InstagramAccount.assigned_employee_id: None}, synchronize_session=False
     )
     
+    # Reports and download records are kept but detached, as the ORM delete used to do implicitly.
+    # Their numbers stay in the day totals (daily_follower_totals, download_daily_totals); only the
+    # per-employee rows go, so rebuild_download_rollup / rebuild_report_totals give the same tables.
+    db.query(models.DailyReport).filter(models.DailyReport.employee_id == params_emp_id).update(
+        {models.DailyReport.employee_id: None}, synchronize_session=False
+    )
+    db.query(models.DownloadRecord).filter(models.DownloadRecord.employee_id == params_emp_id).update(
+        {models.DownloadRecord.employee_id: None}, synchronize_session=False
+    )
+    db.query(models.EmployeeDailyFollowerTotal).filter(models.EmployeeDailyFollowerTotal.employee_id == params_emp_id).delete(synchronize_session=False)
+    db.query(models.DownloadDailyRollup).filter(models.DownloadDailyRollup.employee_id == params_emp_id).delete(synchronize_session=False)
+
     # Delete Employee record
     db.delete(emp)
     
@@ -220,28 +231,44 @@ def delete_employee(id: int, db: Session = Depends(get_db), current_user: models
          db.delete(user)
 
     db.commit()
+    cache.bump(cache.EMPLOYEES, cache.ACCOUNTS, cache.DOWNLOADS, cache.REPORTS)
+    auth.principal_cache.invalidate_user(user_id=emp.user_id)
     return {"status": "success"}
 
-@app.get("/admin/employees", response_model=List[EmployeeOut])
-def list_employees(db: Session = Depends(get_db), current_user: models.User = Depends(auth.get_current_active_admin)):
-    emps = db.query(models.Employee).all()
+def _list_employees_payload(db: Session):
+    # assigned_count is a maintained counter (counters.py), no per-employee COUNT
+    rows = db.query(
+        models.Employee.id,
+        models.Employee.full_name,
+        models.Employee.account_quota,
+        models.Employee.visible_password,
+        models.User.username,
+        models.Employee.assigned_count
+    ).outerjoin(models.User, models.User.id == models.Employee.user_id)\
+     .order_by(models.Employee.id).all()
+
     res = []
-    for e in emps:
-        # Safety check for orphaned employee records
-        u_name = e.user.username if e.user else "Unknown/Deleted"
-        
+    for r in rows:
         res.append({
-            "id": e.id,
-            "full_name": e.full_name,
-            "user_name": u_name,
-            "account_quota": e.account_quota or 0,
-            "assigned_count": len(e.assigned_accounts) if e.assigned_accounts else 0,
-            "visible_password": e.visible_password or "******" # Return visible
+            "id": r.id,
+            "full_name": r.full_name,
+            # Safety check for orphaned employee records
+            "user_name": r.username if r.username else "Unknown/Deleted",
+            "account_quota": r.account_quota or 0,
+            "assigned_count": r.assigned_count or 0,
+            "visible_password": r.visible_password or "******" # Return visible
         })
     return res
 
+@app.get("/admin/employees", response_model=List[EmployeeOut])
+def list_employees(request: Request, db: Session = Depends(get_db), current_user: auth.Principal = Depends(auth.get_current_active_admin)):
+    return response_cache.respond(
+        request, ("employees",), (cache.EMPLOYEES, cache.ACCOUNTS),
+        lambda: _list_employees_payload(db)
+    )
+
 @app.get("/admin/employee/{id}", response_model=EmployeeDetailOut)
-def get_employee_details(id: int, db: Session = Depends(get_db), current_user: models.User = Depends(auth.get_current_active_admin)):
+def get_employee_details(id: int, db: Session = Depends(get_db), current_user: auth.Principal = Depends(auth.get_current_active_admin)):
     emp = db.query(models.Employee).filter(models.Employee.id == id).first()
     if not emp:
         raise HTTPException(status_code=404, detail="Employee not found")
@@ -262,41 +289,82 @@ def get_employee_details(id: int, db: Session = Depends(get_db), current_user: m
     }
 
 @app.post("/admin/create-instagram-account")
-def create_instagram_account(acc: InstagramAccountCreate, db: Session = Depends(get_db), current_user: models.User = Depends(auth.get_current_active_admin)):
+def create_instagram_account(acc: InstagramAccountCreate, db: Session = Depends(get_db), current_user: auth.Principal = Depends(auth.get_current_active_admin)):
     if db.query(models.InstagramAccount).filter(models.InstagramAccount.username == acc.username).first():
         raise HTTPException(status_code=400, detail="Account already exists")
     
     new_acc = models.InstagramAccount(username=acc.username, password=acc.password)
     db.add(new_acc)
     db.commit()
+    cache.bump(cache.ACCOUNTS)
     return {"status": "success"}
 
+@app.post("/admin/import-accounts")
+def import_accounts(
+    file: UploadFile = File(...),
+    employee_id: Optional[int] = Form(None),
+    db: Session = Depends(get_db),
+    current_user: auth.Principal = Depends(auth.get_current_active_admin)
+):
+    """CSV/TSV upload (username,password). Runs in the background; poll /admin/import-jobs/{id}."""
+    if employee_id is not None:
+        if not db.query(models.Employee.id).filter(models.Employee.id == employee_id).first():
+            raise HTTPException(status_code=404, detail="Employee not found")
+
+    # Copy the upload to our own temp file in blocks; the UploadFile is closed after the response
+    fd, path = tempfile.mkstemp(prefix="import-", suffix=".csv")
+    with os.fdopen(fd, "wb") as out:
+        shutil.copyfileobj(file.file, out, 1024 * 1024)
+
+    job = account_import.start_import_job(file.filename, path, employee_id)
+    return {"status": "queued", "job_id": job.id}
+
+@app.get("/admin/import-jobs/{job_id}")
+def get_import_job(job_id: str, current_user: auth.Principal = Depends(auth.get_current_active_admin)):
+    job = account_import.get_import_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job.as_dict()
+
 @app.post("/admin/assign-accounts")
-def assign_accounts(req: AssignRequest, db: Session = Depends(get_db), current_user: models.User = Depends(auth.get_current_active_admin)):
-    # Find unassigned accounts
-    unassigned = db.query(models.InstagramAccount).filter(models.InstagramAccount.assigned_employee_id == None).limit(req.limit).all()
-    
-    if not unassigned:
+def assign_accounts(req: AssignRequest, db: Session = Depends(get_db), current_user: auth.Principal = Depends(auth.get_current_active_admin)):
+    if req.employee_ids:
+        employee_ids = list(dict.fromkeys(req.employee_ids))
+        mode = req.mode
+        if mode not in distribution.MODES:
+            raise HTTPException(status_code=400, detail=f"Unknown mode: {mode}")
+    elif req.employee_id is not None:
+        employee_ids = [req.employee_id]
+        mode = "round_robin"
+    else:
+        raise HTTPException(status_code=400, detail="employee_id or employee_ids is required")
+
+    found = {e for (e,) in db.query(models.Employee.id).filter(models.Employee.id.in_(employee_ids))}
+    missing = [e for e in employee_ids if e not in found]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Employee not found: {missing}")
+
+    claimed = distribution.distribute(db, employee_ids, mode, req.limit, req.weights)
+    cache.bump(cache.ACCOUNTS)
+    count = sum(claimed.values())
+
+    if not count:
         return {"status": "info", "msg": "No unassigned accounts found"}
-    
-    for acc in unassigned:
-        acc.assigned_employee_id = req.employee_id
-    
-    db.commit()
-    return {"status": "success", "count": len(unassigned)}
+    return {"status": "success", "count": count, "assigned": claimed}
 
 @api_router.post("/admin/add-quota")
-def add_quota(req: QuotaRequest, db: Session = Depends(get_db), current_user: models.User = Depends(auth.get_current_active_admin)):
+def add_quota(req: QuotaRequest, db: Session = Depends(get_db), current_user: auth.Principal = Depends(auth.get_current_active_admin)):
     emp = db.query(models.Employee).filter(models.Employee.id == req.employee_id).first()
     if not emp:
         raise HTTPException(status_code=404, detail="Employee not found")
     
     emp.account_quota += req.amount
     db.commit()
+    cache.bump(cache.EMPLOYEES)
     return {"status": "success", "new_quota": emp.account_quota}
 
 @api_router.post("/admin/update-quota")
-def update_quota(req: QuotaRequest, db: Session = Depends(get_db), current_user: models.User = Depends(auth.get_current_active_admin)):
+def update_quota(req: QuotaRequest, db: Session = Depends(get_db), current_user: auth.Principal = Depends(auth.get_current_active_admin)):
     emp = db.query(models.Employee).filter(models.Employee.id == req.employee_id).first()
     if not emp:
         raise HTTPException(status_code=404, detail="Employee not found")
@@ -304,71 +372,130 @@ def update_quota(req: QuotaRequest, db: Session = Depends(get_db), current_user:
     # Here, 'amount' will be treated as the NEW TOTAL quota
     emp.account_quota = req.amount
     db.commit()
+    cache.bump(cache.EMPLOYEES)
     return {"status": "success", "new_quota": emp.account_quota}
 
 @app.delete("/admin/instagram-account/{id}")
-def delete_instagram_account(id: int, db: Session = Depends(get_db), current_user: models.User = Depends(auth.get_current_active_admin)):
+def delete_instagram_account(id: int, db: Session = Depends(get_db), current_user: auth.Principal = Depends(auth.get_current_active_admin)):
     acc = db.query(models.InstagramAccount).filter(models.InstagramAccount.id == id).first()
     if not acc:
         raise HTTPException(status_code=404, detail="Account not found")
     
+    counters.adjust_assigned(db, acc.assigned_employee_id, -1)
     db.delete(acc)
     db.commit()
+    cache.bump(cache.ACCOUNTS, cache.REPORTS)
     return {"status": "success"}
 
 class NoteRequest(BaseModel):
     content: str
 
-@app.get("/admin/daily-summary")
-def daily_summary(db: Session = Depends(get_db), current_user: models.User = Depends(auth.get_current_active_admin)):
-    # Trigger late locking
-    lock_past_reports(db)
-    
-    today = get_today_date()
-    
-    # Aggregate reports
-    # Get all reports
-    reports = db.query(models.DailyReport).filter(models.DailyReport.date == today).all()
-    
-    total_followers = sum(r.follower_count for r in reports)
-    
-    # Return detailed list + header
-    data = []
-    for r in reports:
-        data.append({
-            "employee_name": r.employee.full_name,
-            "account": r.account.username,
-            "count": r.follower_count,
-            "locked": r.locked
-        })
+def _daily_summary_payload(db: Session, today: date, limit: Optional[int] = None, after_id: Optional[int] = None):
+    # Header: one row from the maintained per-day totals
+    header = db.query(models.DailyFollowerTotal.total_followers, models.DailyFollowerTotal.report_count)\
+        .filter(models.DailyFollowerTotal.day == today).first()
+    total_followers, report_count = header if header else (0, 0)
+
+    # Detail list: names joined in one projection, keyset-paged on the report id
+    query = db.query(
+        models.DailyReport.id,
+        models.Employee.full_name,
+        models.InstagramAccount.username,
+        models.DailyReport.follower_count,
+        models.DailyReport.locked
+    ).outerjoin(models.Employee, models.Employee.id == models.DailyReport.employee_id)\
+     .outerjoin(models.InstagramAccount, models.InstagramAccount.id == models.DailyReport.instagram_account_id)\
+     .filter(models.DailyReport.date == today)
+    if after_id is not None:
+        query = query.filter(models.DailyReport.id > after_id)
+    query = query.order_by(models.DailyReport.id)
+    if limit:
+        query = query.limit(limit)
+    rows = query.all()
+
+    data = [{
+        "employee_name": r[1] or "-",
+        "account": r[2] or "-",
+        "count": r[3],
+        "locked": r[4]
+    } for r in rows]
+    next_cursor = pagination.encode_cursor(today, rows[-1][0]) if limit and len(rows) == limit else None
 
     # Calculate download stats for last 7 days
     download_stats = []
     end = today
     start = end - timedelta(days=6)
     
-    # Simple query for stats
-    recs = db.query(models.DownloadRecord).filter(models.DownloadRecord.start_date >= start).all()
-    # Group by date
-    d_map = {}
-    for r in recs:
-        d_str = r.start_date.isoformat()
-        d_map[d_str] = d_map.get(d_str, 0) + r.count
+    # One row per day from the maintained day totals
+    rows = db.query(models.DownloadDailyTotal.day, models.DownloadDailyTotal.count)\
+        .filter(models.DownloadDailyTotal.day >= start)\
+        .order_by(models.DownloadDailyTotal.day.desc()).all()
     
     # Format for UI
-    sorted_dates = sorted(d_map.keys(), reverse=True)
-    for d in sorted_dates:
-        download_stats.append({"date": d, "count": d_map[d]})
+    for d, count in rows:
+        download_stats.append({"date": d.isoformat(), "count": count or 0})
         
     return {
         "date": str(today),
-        "total_followers": total_followers,
+        "total_followers": total_followers or 0,
+        "report_count": report_count or 0,
         "reports": data,
+        "next_cursor": next_cursor,
         "downloads_by_date": download_stats
     }
 
-@app.get("/general/note")
-def get_admin_note(db: Session = Depends(get_db)):
+@app.get("/admin/daily-summary")
+def daily_summary(
+    request: Request,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: auth.Principal = Depends(auth.get_current_active_admin)
+):
+    today = get_today_date()
+    after_id = pagination.decode_cursor(cursor, date.fromisoformat)[1] if cursor else None
+    return response_cache.respond(
+        request, ("daily_summary", str(today), limit, after_id), (cache.REPORTS, cache.DOWNLOADS, cache.EMPLOYEES, cache.ACCOUNTS),
+        lambda: _daily_summary_payload(db, today, limit, after_id)
+    )
+
+@app.get("/admin/events")
+async def admin_events(request: Request, token: Optional[str] = None):
+    """SSE stream: today's summary as a snapshot, then report/download/rollover events.
+
+    EventSource can't send headers, so the token may also be passed as ?token=.
+    """
+    if not token:
+        header = request.headers.get("authorization", "")
+        token = header[7:] if header.lower().startswith("bearer ") else None
+    if not token:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+
+    def load_snapshot():
+        db = SessionLocal()
+        try:
+            principal = auth.authenticate_token(db, token)
+            if principal.role != "admin":
+                raise HTTPException(status_code=403, detail="The user doesn't have enough privileges")
+            return _daily_summary_payload(db, get_today_date())
+        finally:
+            db.close()
+
+    # Subscribe before building the snapshot so nothing written in between is missed
+    sub = event_broker.subscribe()
+    try:
+        snapshot = await run_in_threadpool(load_snapshot)
+    except Exception:
+        event_broker.unsubscribe(sub)
+        raise
+
+    return StreamingResponse(
+        event_broker.stream(request, sub, snapshot),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def _admin_note_payload(db: Session):
     note = db.query(models.AdminNote).first()
     return {
         "content": note.content if note else "",
@@ -376,8 +503,12 @@ def get_admin_note(db: Session = Depends(get_db)):
         "updated_at": note.updated_at if note else None
     }
 
+@app.get("/general/note")
+def get_admin_note(db: Session = Depends(get_db)):
+    return _admin_note_payload(db)
+
 @app.post("/admin/note")
-def update_admin_note(req: NoteRequest, db: Session = Depends(get_db), current_user: models.User = Depends(auth.get_current_active_admin)):
+def update_admin_note(req: NoteRequest, db: Session = Depends(get_db), current_user: auth.Principal = Depends(auth.get_current_active_admin)):
     note = db.query(models.AdminNote).first()
     if not note:
         note = models.AdminNote(content=req.content, author=current_user.username)
@@ -387,99 +518,269 @@ def update_admin_note(req: NoteRequest, db: Session = Depends(get_db), current_u
         note.author = current_user.username # Update author
         note.updated_at = datetime.now()
     db.commit()
+    cache.bump(cache.NOTES)
     return {"status": "success"}
 
-@app.get("/admin/logs")
-def get_audit_logs(limit: int = 50, db: Session = Depends(get_db), current_user: models.User = Depends(auth.get_current_active_admin)):
-    logs = db.query(models.AuditLog).order_by(models.AuditLog.timestamp.desc()).limit(limit).all()
-    
-    res = []
-    for l in logs:
+def _audit_log_row(row):
+    return {
+        "id": row.id,
         # Get username safely
-        uname = l.user.username if l.user else "Unknown"
-        res.append({
-            "id": l.id,
-            "username": uname,
-            "action": l.action,
-            "details": l.details,
-            "ip_address": l.ip_address,
-            "timestamp": l.timestamp.strftime("%Y-%m-%d %H:%M:%S")
-        })
-    return res
+        "username": row.username if row.username else "Unknown",
+        "action": row.action,
+        "details": row.details,
+        "ip_address": row.ip_address,
+        "timestamp": row.timestamp.strftime("%Y-%m-%d %H:%M:%S")
+    }
+
+@app.get("/admin/logs")
+def get_audit_logs(
+    response: Response,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    format: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: auth.Principal = Depends(auth.get_current_active_admin)
+):
+    stmt = select(
+        models.AuditLog.id,
+        models.AuditLog.action,
+        models.AuditLog.details,
+        models.AuditLog.ip_address,
+        models.AuditLog.timestamp,
+        models.User.username
+    ).outerjoin(models.User, models.User.id == models.AuditLog.user_id)\
+     .order_by(models.AuditLog.timestamp.desc(), models.AuditLog.id.desc())
+
+    if format:
+        return pagination.stream_rows(
+            stmt, _audit_log_row, format,
+            ["id", "username", "action", "details", "ip_address", "timestamp"], "audit_logs"
+        )
+
+    if cursor:
+        # Keyset: continue strictly after the last (timestamp, id) of the previous page
+        ts, last_id = pagination.decode_cursor(cursor, datetime.fromisoformat)
+        stmt = stmt.where(or_(
+            models.AuditLog.timestamp < ts,
+            and_(models.AuditLog.timestamp == ts, models.AuditLog.id < last_id)
+        ))
+
+    rows = db.execute(stmt.limit(limit)).all()
+    if rows and len(rows) == limit:
+        response.headers["X-Next-Cursor"] = pagination.encode_cursor(rows[-1].timestamp, rows[-1].id)
+
+    return [_audit_log_row(r) for r in rows]
+
+def _report_row(row, today):
+    return {
+        "id": row.id,
+        "date": str(row.date),
+        "employee_name": row.employee_name or "-",
+        "account_username": row.account_username or "-",
+        "count": row.follower_count,
+        "locked": is_report_locked(row.locked, row.date, today)
+    }
 
 @app.get("/admin/all-reports")
 def get_all_reports(
+    response: Response,
     start_date: Optional[str] = None, 
     end_date: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    format: Optional[str] = None,
     db: Session = Depends(get_db), 
-    current_user: models.User = Depends(auth.get_current_active_admin)
+    current_user: auth.Principal = Depends(auth.get_current_active_admin)
 ):
-    query = db.query(models.DailyReport)
+    # Names come from a join instead of lazy loading r.employee / r.account per row; outer joins keep
+    # reports whose employee or account was deleted
+    stmt = select(
+        models.DailyReport.id,
+        models.DailyReport.date,
+        models.DailyReport.follower_count,
+        models.DailyReport.locked,
+        models.Employee.full_name.label("employee_name"),
+        models.InstagramAccount.username.label("account_username")
+    ).outerjoin(models.Employee, models.Employee.id == models.DailyReport.employee_id)\
+     .outerjoin(models.InstagramAccount, models.InstagramAccount.id == models.DailyReport.instagram_account_id)
     
     if start_date:
-        query = query.filter(models.DailyReport.date >= start_date)
+        stmt = stmt.where(models.DailyReport.date >= start_date)
     if end_date:
-        query = query.filter(models.DailyReport.date <= end_date)
+        stmt = stmt.where(models.DailyReport.date <= end_date)
         
-    # Order by date desc
-    reports = query.order_by(models.DailyReport.date.desc()).all()
-    
-    res = []
-    for r in reports:
-        res.append({
-            "id": r.id,
-            "date": str(r.date),
-            "employee_name": r.employee.full_name,
-            "account_username": r.account.username,
-            "count": r.follower_count,
-            "locked": r.locked
-        })
-    return res
+    # Order by date desc (id breaks ties so the keyset is stable)
+    stmt = stmt.order_by(models.DailyReport.date.desc(), models.DailyReport.id.desc())
 
-# --- Employee Endpoints ---
+    today = get_today_date()
+    to_dict = lambda r: _report_row(r, today)
 
-@api_router.get("/employee/dashboard-data", response_model=EmployeeDashboardData)
-def get_employee_dashboard_data(db: Session = Depends(get_db), current_user: models.User = Depends(auth.get_current_active_employee)):
-    emp = current_user.employee
-    accounts = []
-    for acc in emp.assigned_accounts:
-        accounts.append({
-            "id": acc.id,
-            "username": acc.username,
-            "password": acc.password or ""
-        })
+    if format:
+        return pagination.stream_rows(
+            stmt, to_dict, format,
+            ["id", "date", "employee_name", "account_username", "count", "locked"], "reports"
+        )
+
+    if cursor:
+        last_date, last_id = pagination.decode_cursor(cursor, date.fromisoformat)
+        stmt = stmt.where(or_(
+            models.DailyReport.date < last_date,
+            and_(models.DailyReport.date == last_date, models.DailyReport.id < last_id)
+        ))
+    if limit:
+        stmt = stmt.limit(limit)
+
+    rows = db.execute(stmt).all()
+    if limit and len(rows) == limit:
+        response.headers["X-Next-Cursor"] = pagination.encode_cursor(rows[-1].date, rows[-1].id)
+
+    return [to_dict(r) for r in rows]
+
+# --- Analytics ---
+
+ANALYTICS_MAX_DAYS = 366
+
+def _analytics_range(start_date: Optional[date], end_date: Optional[date]):
+    end = end_date or get_today_date()
+    start = start_date or end - timedelta(days=6)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start_date is after end_date")
+    if (end - start).days >= ANALYTICS_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f"Range is limited to {ANALYTICS_MAX_DAYS} days")
+    return start, end
+
+def _run_analytics(fn, *args, **kwargs):
+    try:
+        return fn(*args, **kwargs)
+    except analytics.AnalyticsUnavailable as e:
+        raise HTTPException(status_code=501, detail=str(e))
+
+@app.get("/admin/analytics/growth")
+def get_growth_analytics(
+    request: Request,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    k: int = 10,
+    db: Session = Depends(get_db),
+    current_user: auth.Principal = Depends(auth.get_current_active_admin)
+):
+    """Top-k gaining / losing accounts and per-employee growth (default: last 7 days)."""
+    start, end = _analytics_range(start_date, end_date)
+    k = max(1, min(k, 100))
+    return response_cache.respond(
+        request, ("analytics_growth", str(start), str(end), k), (cache.REPORTS, cache.ACCOUNTS, cache.EMPLOYEES),
+        lambda: _run_analytics(analytics.growth_summary, db, start, end, k)
+    )
+
+@app.get("/admin/analytics/series")
+def get_growth_series(
+    request: Request,
+    account_id: Optional[int] = None,
+    employee_id: Optional[int] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: Session = Depends(get_db),
+    current_user: auth.Principal = Depends(auth.get_current_active_admin)
+):
+    """Daily delta and rolling 7/30-day growth for one account or one employee."""
+    if (account_id is None) == (employee_id is None):
+        raise HTTPException(status_code=400, detail="Pass exactly one of account_id or employee_id")
+    start, end = _analytics_range(start_date, end_date)
+    return response_cache.respond(
+        request, ("analytics_series", account_id, employee_id, str(start), str(end)), (cache.REPORTS,),
+        lambda: _run_analytics(analytics.growth_series, db, start, end, account_id=account_id, employee_id=employee_id)
+    )
+
+def _perf_stats():
     return {
-        "quota": emp.account_quota,
-        "assigned_accounts": accounts
+        "audit": audit_writer.stats(),
+        "rollover": rollover_scheduler.stats(),
+        "auth_cache": auth.principal_cache.stats(),
+        "hashing": auth.hashing_pool.stats(),
+        "db_pool": pool_stats(),
+        "response_cache": response_cache.stats(),
+        "events": event_broker.stats()
     }
 
+@app.get("/admin/perf-stats")
+def get_perf_stats(current_user: auth.Principal = Depends(auth.get_current_active_admin)):
+    return _perf_stats()
+
+@app.get("/admin/slow-queries")
+def get_slow_queries(limit: int = 50, current_user: auth.Principal = Depends(auth.get_current_active_admin)):
+    return slow_query_log.snapshot(limit)
+
+@app.delete("/admin/slow-queries")
+def clear_slow_queries(current_user: auth.Principal = Depends(auth.get_current_active_admin)):
+    slow_query_log.clear()
+    return {"status": "success"}
+
+@app.get("/admin/metrics")
+def get_metrics(current_user: auth.Principal = Depends(auth.get_current_active_admin)):
+    """Prometheus text format: per-route latency, SQL statements and DB time, plus internal counters."""
+    body = metrics.metrics.render(metrics.flatten_stats("panel", _perf_stats()))
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4")
+
+# --- Employee Endpoints ---
+
+def _assigned_account_rows(db: Session, employee_id: int, with_password: bool):
+    # Plain tuples straight from SQL: no ORM objects, no per-row validation
+    cols = [models.InstagramAccount.id, models.InstagramAccount.username]
+    if with_password:
+        cols.append(models.InstagramAccount.password)
+    rows = db.query(*cols).filter(models.InstagramAccount.assigned_employee_id == employee_id)\
+        .order_by(models.InstagramAccount.id).all()
+    if with_password:
+        return [{"id": r[0], "username": r[1], "password": r[2] or ""} for r in rows]
+    return [{"id": r[0], "username": r[1]} for r in rows]
+
+@api_router.get("/employee/dashboard-data", response_model=EmployeeDashboardData)
+def get_employee_dashboard_data(request: Request, db: Session = Depends(get_db), current_user: auth.Principal = Depends(auth.get_current_active_employee)):
+    quota = db.query(models.Employee.account_quota).filter(models.Employee.id == current_user.employee_id).first()
+    if quota is None:
+        raise HTTPException(status_code=404, detail="Employee not found")
+    return fastjson.fast_json(request, {
+        "quota": quota[0] or 0,
+        "assigned_accounts": _assigned_account_rows(db, current_user.employee_id, with_password=True)
+    })
+
 @app.post("/employee/bulk-create-accounts")
-def bulk_create_accounts(req: BulkAccountCreate, db: Session = Depends(get_db), current_user: models.User = Depends(auth.get_current_active_employee)):
-    emp = current_user.employee
-    current_count = len(emp.assigned_accounts)
+def bulk_create_accounts(req: BulkAccountCreate, db: Session = Depends(get_db), current_user: auth.Principal = Depends(auth.get_current_active_employee)):
+    emp = get_current_employee(db, current_user)
+    current_count = emp.assigned_count or 0
     new_count = len(req.accounts)
     
     if current_count + new_count > emp.account_quota:
         raise HTTPException(status_code=400, detail=f"Quota exceeded. You can add max {emp.account_quota - current_count} more accounts.")
-        
-    for acc in req.accounts:
-        # Check duplicate
-        if db.query(models.InstagramAccount).filter(models.InstagramAccount.username == acc.username).first():
-             raise HTTPException(status_code=400, detail=f"User {acc.username} already exists")
-             
-        new_acc = models.InstagramAccount(
-            username=acc.username, 
-            password=acc.password,
-            assigned_employee_id=emp.id
-        )
-        db.add(new_acc)
-        
-    db.commit()
-    return {"status": "success"}
+
+    # Check duplicates (inside the paste and against the table) all at once
+    rows = [{"username": acc.username, "password": acc.password} for acc in req.accounts]
+    rows, repeated = account_import.split_batch_duplicates(rows)
+    existing = account_import.find_existing_usernames(db, [r["username"] for r in rows])
+    conflicts = repeated + sorted(existing)
+    if conflicts:
+        raise HTTPException(status_code=400, detail={
+            "msg": f"{len(conflicts)} account(s) already exist or are repeated",
+            "conflicts": conflicts
+        })
+
+    try:
+        # Quota check and counter increment in one UPDATE, so concurrent pastes can't overshoot
+        if not counters.reserve_assigned(db, emp.id, len(rows)):
+            db.rollback()
+            raise HTTPException(status_code=400, detail="Quota exceeded")
+        account_import.insert_accounts(db, rows, emp.id, count_assigned=False)
+        db.commit()
+        cache.bump(cache.ACCOUNTS)
+    except IntegrityError:
+        # Someone inserted one of these usernames between the check and the insert
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Some accounts were created concurrently, please retry")
+    return {"status": "success", "created": len(rows)}
 
 @api_router.get("/employee/accounts", response_model=List[AccountOut])
-def get_my_accounts(db: Session = Depends(get_db), current_user: models.User = Depends(auth.get_current_active_employee)):
-    return current_user.employee.assigned_accounts
+def get_my_accounts(request: Request, db: Session = Depends(get_db), current_user: auth.Principal = Depends(auth.get_current_active_employee)):
+    return fastjson.fast_json(request, _assigned_account_rows(db, current_user.employee_id, with_password=False))
 
 class AccountUpdate(BaseModel):
     username: str
@@ -491,40 +792,71 @@ def update_account(
     req: AccountUpdate,
     request: Request, 
     db: Session = Depends(get_db), 
-    current_user: models.User = Depends(auth.get_current_active_employee)
+    current_user: auth.Principal = Depends(auth.get_current_active_employee)
 ):
     # Verify ownership
     account = db.query(models.InstagramAccount).filter(models.InstagramAccount.id == account_id).first()
     if not account:
         raise HTTPException(status_code=404, detail="Account not found")
     
-    if account.assigned_employee_id != current_user.employee.id:
+    if account.assigned_employee_id != current_user.employee_id:
         raise HTTPException(status_code=403, detail="Not authorized to edit this account")
     
     account.username = req.username
     account.password = req.password
     db.commit()
+    cache.bump(cache.ACCOUNTS)
     
     # Log
     create_audit_log(db, current_user.id, "UPDATE_ACCOUNT", f"Updated account {account.username}", request.client.host)
     
     return {"status": "success"}
 
+MAX_REPORT_BATCH = 1000
+
+def upsert_daily_reports(db: Session, rows):
+    """Inserts today's reports, updating follower_count where one exists and is not locked."""
+    dialect_insert = get_dialect_insert(db)
+    if dialect_insert is None:
+        for row in rows:
+            updated = db.query(models.DailyReport).filter(
+                models.DailyReport.employee_id == row["employee_id"],
+                models.DailyReport.instagram_account_id == row["instagram_account_id"],
+                models.DailyReport.date == row["date"],
+                models.DailyReport.locked == False
+            ).update({models.DailyReport.follower_count: row["follower_count"]}, synchronize_session=False)
+            if not updated:
+                db.add(models.DailyReport(**row))
+        db.flush()
+        return
+
+    # One statement on the unique_daily_report constraint
+    stmt = dialect_insert(models.DailyReport).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[models.DailyReport.employee_id, models.DailyReport.instagram_account_id, models.DailyReport.date],
+        set_={"follower_count": stmt.excluded.follower_count},
+        where=(models.DailyReport.locked == False)
+    )
+    db.execute(stmt)
+
+def _publish_report_event(db: Session, status: str, today: date, employee_id: int, acc, count: int):
+    if not event_broker.active:
+        return
+    name = db.query(models.Employee.full_name).filter(models.Employee.id == employee_id).scalar()
+    event_broker.publish("report", events.report_event(status, today, employee_id, name, acc.id, acc.username, count))
+
 @app.post("/employee/report")
-def submit_report(rep: ReportCreate, request: Request, db: Session = Depends(get_db), current_user: models.User = Depends(auth.get_current_active_employee)):
-    # Trigger late locking (good practice to ensure state is clean)
-    lock_past_reports(db)
-    
+def submit_report(rep: ReportCreate, request: Request, db: Session = Depends(get_db), current_user: auth.Principal = Depends(auth.get_current_active_employee)):
     today = get_today_date()
     
     # Check if account belongs to employee
     acc = db.query(models.InstagramAccount).filter(models.InstagramAccount.id == rep.instagram_account_id).first()
-    if not acc or acc.assigned_employee_id != current_user.employee.id:
+    if not acc or acc.assigned_employee_id != current_user.employee_id:
         raise HTTPException(status_code=403, detail="Not authorized for this account")
 
     # Check existing report
     existing = db.query(models.DailyReport).filter(
-        models.DailyReport.employee_id == current_user.employee.id,
+        models.DailyReport.employee_id == current_user.employee_id,
         models.DailyReport.instagram_account_id == acc.id,
         models.DailyReport.date == today
     ).first()
@@ -532,43 +864,118 @@ def submit_report(rep: ReportCreate, request: Request, db: Session = Depends(get
     if existing:
         if existing.locked:
             raise HTTPException(status_code=400, detail="Report is locked")
+        rollups.add_report_totals(db, current_user.employee_id, today, rep.follower_count - (existing.follower_count or 0))
         existing.follower_count = rep.follower_count
         db.commit()
+        cache.bump(cache.REPORTS)
+        _publish_report_event(db, "updated", today, current_user.employee_id, acc, rep.follower_count)
         # Log
         create_audit_log(db, current_user.id, "UPDATE_REPORT", f"Updated report for {acc.username}: {rep.follower_count}", request.client.host)
         return {"status": "updated"}
     
     report = models.DailyReport(
-        employee_id=current_user.employee.id,
+        employee_id=current_user.employee_id,
         instagram_account_id=acc.id,
         date=today,
         follower_count=rep.follower_count
     )
     db.add(report)
+    rollups.add_report_totals(db, current_user.employee_id, today, rep.follower_count, 1)
     db.commit()
+    cache.bump(cache.REPORTS)
+    _publish_report_event(db, "submitted", today, current_user.employee_id, acc, rep.follower_count)
     
     # Log
     create_audit_log(db, current_user.id, "SUBMIT_REPORT", f"Report for {acc.username}: {rep.follower_count}", request.client.host)
 
     return {"status": "success"}
 
+@app.post("/employee/report/batch")
+def submit_report_batch(reps: List[ReportCreate], request: Request, db: Session = Depends(get_db), current_user: auth.Principal = Depends(auth.get_current_active_employee)):
+    """Submits many follower counts at once; returns a status per item."""
+    if len(reps) > MAX_REPORT_BATCH:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_REPORT_BATCH} reports per batch")
+    today = get_today_date()
+    employee_id = current_user.employee_id
+
+    # Last value wins if the same account is sent twice
+    counts = {}
+    for rep in reps:
+        counts[rep.instagram_account_id] = rep.follower_count
+
+    # Ownership for every account in one query
+    owned = dict(db.query(models.InstagramAccount.id, models.InstagramAccount.username).filter(
+        models.InstagramAccount.id.in_(list(counts)),
+        models.InstagramAccount.assigned_employee_id == employee_id
+    ).all()) if counts else {}
+
+    # Today's existing rows tell submitted / updated / locked apart (and give the totals delta)
+    existing = {a: (locked, old) for a, locked, old in db.query(
+        models.DailyReport.instagram_account_id, models.DailyReport.locked, models.DailyReport.follower_count
+    ).filter(
+        models.DailyReport.employee_id == employee_id,
+        models.DailyReport.date == today,
+        models.DailyReport.instagram_account_id.in_(list(owned))
+    ).all()} if owned else {}
+
+    statuses = {}
+    rows = []
+    follower_delta = 0
+    for account_id, count in counts.items():
+        if account_id not in owned:
+            statuses[account_id] = "forbidden"
+        elif account_id in existing and existing[account_id][0]:
+            statuses[account_id] = "locked"
+        else:
+            statuses[account_id] = "updated" if account_id in existing else "submitted"
+            old_count = existing[account_id][1] if account_id in existing else 0
+            follower_delta += count - (old_count or 0)
+            rows.append({
+                "employee_id": employee_id,
+                "instagram_account_id": account_id,
+                "date": today,
+                "follower_count": count,
+                "locked": False
+            })
+
+    if rows:
+        submitted = sum(1 for st in statuses.values() if st == "submitted")
+        updated = sum(1 for st in statuses.values() if st == "updated")
+        upsert_daily_reports(db, rows)
+        rollups.add_report_totals(db, employee_id, today, follower_delta, submitted)
+        db.commit()
+        cache.bump(cache.REPORTS)
+
+        # One aggregated audit entry for the whole batch
+        create_audit_log(db, current_user.id, "SUBMIT_REPORT_BATCH", f"Batch report: {submitted} submitted, {updated} updated", request.client.host)
+
+        if event_broker.active:
+            name = db.query(models.Employee.full_name).filter(models.Employee.id == employee_id).scalar()
+            for row in rows:
+                account_id = row["instagram_account_id"]
+                event_broker.publish("report", events.report_event(
+                    statuses[account_id], today, employee_id, name, account_id, owned[account_id], row["follower_count"]
+                ))
+
+    return {
+        "status": "success",
+        "results": [{"instagram_account_id": a, "status": st} for a, st in statuses.items()]
+    }
+
+def _report_status_payload(db: Session, employee_id: int, today: date):
+    rows = db.query(
+        models.DailyReport.instagram_account_id,
+        models.DailyReport.follower_count,
+        models.DailyReport.locked
+    ).filter(
+        models.DailyReport.employee_id == employee_id,
+        models.DailyReport.date == today
+    ).all()
+    return [{"account_id": r[0], "count": r[1], "locked": r[2]} for r in rows]
+
 @app.get("/employee/report-status")
-def get_today_reports(db: Session = Depends(get_db), current_user: models.User = Depends(auth.get_current_active_employee)):
-     today = get_today_date()
-     reports = db.query(models.DailyReport).filter(
-         models.DailyReport.employee_id == current_user.employee.id,
-         models.DailyReport.date == today
-     ).all()
-     
-     # Return list of reports
-     res = []
-     for r in reports:
-         res.append({
-             "account_id": r.instagram_account_id,
-             "count": r.follower_count,
-             "locked": r.locked
-         })
-     return res
+def get_today_reports(db: Session = Depends(get_db), current_user: auth.Principal = Depends(auth.get_current_active_employee)):
+     return _report_status_payload(db, current_user.employee_id, get_today_date())
 
 
 
@@ -580,48 +987,57 @@ class DownloadRecordCreate(BaseModel):
     end_date: date
     count: int
 
-@app.get("/admin/download-stats")
-def get_download_stats(
-    start_date: Optional[date] = None, 
-    end_date: Optional[date] = None,
-    db: Session = Depends(get_db), 
-    current_user: models.User = Depends(auth.get_current_active_admin)
-):
-    emps = db.query(models.Employee).all()
-    
-    # Calculate totals from records
+def _get_download_stats_payload(db: Session, start_date: Optional[date], end_date: Optional[date]):
+    # All-time totals are the maintained Employee.total_downloads counter;
+    # only the range part needs a GROUP BY, and only when a range is given
+    if start_date and end_date:
+        # Record is *assigned* to this window if it starts and ends inside [start_date, end_date]
+        sums = db.query(
+            models.DownloadRecord.employee_id.label("employee_id"),
+            func.sum(models.DownloadRecord.count).label("range_count")
+        ).filter(
+            models.DownloadRecord.start_date >= start_date,
+            models.DownloadRecord.end_date <= end_date
+        ).group_by(models.DownloadRecord.employee_id).subquery()
+        range_count = sums.c.range_count
+    else:
+        sums = None
+        range_count = literal(0)
+
+    query = db.query(
+        models.Employee.id,
+        models.Employee.full_name,
+        models.Employee.account_quota,
+        models.User.username,
+        models.Employee.total_downloads.label("total"),
+        range_count.label("range_count")
+    ).outerjoin(models.User, models.User.id == models.Employee.user_id)
+    if sums is not None:
+        query = query.outerjoin(sums, sums.c.employee_id == models.Employee.id)
+    rows = query.order_by(models.Employee.id).all()
+
     emp_stats = []
     grand_total = 0
     grand_range_total = 0
-    
-    for e in emps:
-        # Sum all records
-        all_recs = e.download_records if e.download_records else []
-        total = sum(r.count for r in all_recs)
+    # User requested Sum of Quotas, not count of actual accounts
+    total_accounts = 0
+
+    for r in rows:
+        total = r.total or 0
+        range_count = r.range_count or 0
         grand_total += total
-        
-        # Sum range specific records
-        range_count = 0
-        if start_date and end_date:
-            # Filter: Logic = Record's start_date should be within the querying window
-            # Or strictly: record is *assigned* to this window.
-            # Given the flow, we just check if record.start_date is inside [start_date, end_date]
-            range_count = sum(r.count for r in all_recs if r.start_date >= start_date and r.end_date <= end_date)
-            grand_range_total += range_count
-        
-        u_name = e.user.username if e.user else "Unknown"
+        grand_range_total += range_count
+        total_accounts += r.account_quota or 0
+
         emp_stats.append({
-            "id": e.id,
-            "full_name": e.full_name,
-            "user_name": u_name,
+            "id": r.id,
+            "full_name": r.full_name,
+            "user_name": r.username if r.username else "Unknown",
             "total_downloads": total,
             "range_downloads": range_count
         })
         
     best = max(emp_stats, key=lambda x: x['total_downloads']) if emp_stats else None
-    
-    # User requested Sum of Quotas, not count of actual accounts
-    total_accounts = sum(e.account_quota for e in emps if e.account_quota)
 
     return {
         "total_downloads": grand_total,
@@ -631,8 +1047,21 @@ def get_download_stats(
         "employees": sorted(emp_stats, key=lambda x: x['total_downloads'], reverse=True)
     }
 
+@app.get("/admin/download-stats")
+def get_download_stats(
+    request: Request,
+    start_date: Optional[date] = None, 
+    end_date: Optional[date] = None,
+    db: Session = Depends(get_db), 
+    current_user: auth.Principal = Depends(auth.get_current_active_admin)
+):
+    return response_cache.respond(
+        request, ("download_stats", str(start_date), str(end_date)), (cache.DOWNLOADS, cache.EMPLOYEES),
+        lambda: _get_download_stats_payload(db, start_date, end_date)
+    )
+
 @app.post("/admin/add-download-record")
-def add_download_record(req: DownloadRecordCreate, db: Session = Depends(get_db), current_user: models.User = Depends(auth.get_current_active_admin)):
+def add_download_record(req: DownloadRecordCreate, db: Session = Depends(get_db), current_user: auth.Principal = Depends(auth.get_current_active_admin)):
     emp = db.query(models.Employee).filter(models.Employee.id == req.employee_id).first()
     if not emp:
         raise HTTPException(status_code=404, detail="Employee not found")
@@ -644,70 +1073,112 @@ def add_download_record(req: DownloadRecordCreate, db: Session = Depends(get_db)
         count=req.count
     )
     db.add(rec)
+    rollups.add_download_rollup(db, req.employee_id, req.start_date, req.count)
+    counters.adjust_downloads(db, req.employee_id, req.count)
+    # Read inside the transaction: our own increment, not a concurrent one
+    new_total = db.query(models.Employee.total_downloads).filter(models.Employee.id == req.employee_id).scalar() or 0
     db.commit()
+    cache.bump(cache.DOWNLOADS)
+    event_broker.publish("download", {
+        "employee_id": emp.id,
+        "employee_name": emp.full_name,
+        "start_date": str(req.start_date),
+        "end_date": str(req.end_date),
+        "count": req.count
+    })
     
     # Return new total for UI update
-    new_total = sum(r.count for r in emp.download_records)
     return {"status": "success", "new_total": new_total}
 
-@app.get("/employee/my-downloads")
-def get_my_downloads(db: Session = Depends(get_db), current_user: models.User = Depends(auth.get_current_active_employee)):
-    emp = db.query(models.Employee).filter(models.Employee.user_id == current_user.id).first()
-    if not emp: return {"total_downloads": 0, "recent_activity": []}
-    
-    total = sum(r.count for r in emp.download_records) if emp.download_records else 0
-    
+def _my_downloads_payload(db: Session, employee_id: int, total: int):
     # Get last 5 records
-    recent = db.query(models.DownloadRecord)\
-        .filter(models.DownloadRecord.employee_id == emp.id)\
-        .order_by(models.DownloadRecord.created_at.desc())\
-        .limit(5).all()
-        
-    recent_activity = [{
-        "start_date": r.start_date,
-        "end_date": r.end_date,
-        "count": r.count
-    } for r in recent]
+    recent = db.query(
+        models.DownloadRecord.start_date,
+        models.DownloadRecord.end_date,
+        models.DownloadRecord.count
+    ).filter(models.DownloadRecord.employee_id == employee_id)\
+     .order_by(models.DownloadRecord.created_at.desc())\
+     .limit(5).all()
 
     return {
-        "total_downloads": total,
-        "recent_activity": recent_activity
+        "total_downloads": total or 0,
+        "recent_activity": [{"start_date": r[0], "end_date": r[1], "count": r[2]} for r in recent]
+    }
+
+@app.get("/employee/my-downloads")
+def get_my_downloads(db: Session = Depends(get_db), current_user: auth.Principal = Depends(auth.get_current_active_employee)):
+    # The principal already carries the employee id; no second Employee lookup
+    if current_user.employee_id is None:
+        return {"total_downloads": 0, "recent_activity": []}
+    total = db.query(models.Employee.total_downloads).filter(models.Employee.id == current_user.employee_id).scalar()
+    return _my_downloads_payload(db, current_user.employee_id, total)
+
+def _get_admin_chart_data_payload(db: Session):
+    # Per start date over every record, including ones of deleted employees
+    rows = db.query(models.DownloadDailyTotal.day, models.DownloadDailyTotal.count)\
+        .order_by(models.DownloadDailyTotal.day).all()
+
+    return {
+        "labels": [d.isoformat() for d, _ in rows],
+        "data": [count or 0 for _, count in rows]
     }
 
 @app.get("/admin/chart-data")
-def get_admin_chart_data(db: Session = Depends(get_db), current_user: models.User = Depends(auth.get_current_active_admin)):
-    records = db.query(models.DownloadRecord).order_by(models.DownloadRecord.start_date).all()
-    
-    # Group by start date
-    data_map = {}
-    for r in records:
-        d_str = r.start_date.isoformat()
-        data_map[d_str] = data_map.get(d_str, 0) + r.count
-        
-    sorted_dates = sorted(data_map.keys())
+def get_admin_chart_data(request: Request, db: Session = Depends(get_db), current_user: auth.Principal = Depends(auth.get_current_active_admin)):
+    return response_cache.respond(
+        request, ("admin_chart",), (cache.DOWNLOADS,),
+        lambda: _get_admin_chart_data_payload(db)
+    )
+
+def _employee_chart_payload(db: Session, employee_id: int):
+    rows = db.query(models.DownloadDailyRollup.day, models.DownloadDailyRollup.count)\
+        .filter(models.DownloadDailyRollup.employee_id == employee_id)\
+        .order_by(models.DownloadDailyRollup.day).all()
+
     return {
-        "labels": sorted_dates,
-        "data": [data_map[d] for d in sorted_dates]
+        "labels": [d.isoformat() for d, _ in rows],
+        "data": [count or 0 for _, count in rows]
     }
 
 @app.get("/employee/chart-data")
-def get_employee_chart_data(db: Session = Depends(get_db), current_user: models.User = Depends(auth.get_current_active_employee)):
-    emp = db.query(models.Employee).filter(models.Employee.user_id == current_user.id).first()
-    if not emp: return {"labels": [], "data": []}
-    
-    records = db.query(models.DownloadRecord).filter(models.DownloadRecord.employee_id == emp.id).order_by(models.DownloadRecord.start_date).all()
-    
-    data_map = {}
-    for r in records:
-        d_str = r.start_date.isoformat()
-        data_map[d_str] = data_map.get(d_str, 0) + r.count
-        
-    sorted_dates = sorted(data_map.keys())
+def get_employee_chart_data(db: Session = Depends(get_db), current_user: auth.Principal = Depends(auth.get_current_active_employee)):
+    if current_user.employee_id is None:
+        return {"labels": [], "data": []}
+    return _employee_chart_payload(db, current_user.employee_id)
+
+# Everything the employee page loads on open, in one response
+BOOTSTRAP_TABLES = (cache.ACCOUNTS, cache.REPORTS, cache.DOWNLOADS, cache.EMPLOYEES, cache.NOTES)
+
+def _employee_bootstrap_payload(db: Session, employee_id: int, today: date):
+    # Quota and download total come back in one row
+    row = db.query(models.Employee.account_quota, models.Employee.total_downloads)\
+        .filter(models.Employee.id == employee_id).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Employee not found")
+    quota, total = row
     return {
-        "labels": sorted_dates,
-        "data": [data_map[d] for d in sorted_dates]
+        "dashboard": {
+            "quota": quota or 0,
+            "assigned_accounts": _assigned_account_rows(db, employee_id, with_password=True)
+        },
+        "report_status": _report_status_payload(db, employee_id, today),
+        "downloads": _my_downloads_payload(db, employee_id, total),
+        "chart": _employee_chart_payload(db, employee_id),
+        "note": _admin_note_payload(db),
+        "today": today.isoformat()
     }
 
+@api_router.get("/employee/bootstrap")
+def get_employee_bootstrap(request: Request, db: Session = Depends(get_db), current_user: auth.Principal = Depends(auth.get_current_active_employee)):
+    if current_user.employee_id is None:
+        raise HTTPException(status_code=404, detail="Employee not found")
+    today = get_today_date()
+    # ETag/If-None-Match: an unchanged dashboard is a cache hit answered with 304
+    return response_cache.respond(
+        request, ("employee_bootstrap", current_user.employee_id, today), BOOTSTRAP_TABLES,
+        lambda: _employee_bootstrap_payload(db, current_user.employee_id, today)
+    )
+
 
 # Include API Router
 app.include_router(api_router)
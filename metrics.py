@@ -0,0 +1,205 @@
+"""Request and SQL instrumentation, exposed in Prometheus text format.
+
+MetricsMiddleware times every request and counts its SQL statements through
+engine cursor events; the per-request counters travel in a contextvar, which
+Starlette copies into the threadpool running sync endpoints.
+"""
+import contextvars
+import threading
+import time
+from collections import defaultdict
+
+from sqlalchemy import event
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 500)
+
+
+class RequestStats:
+    __slots__ = ("scope", "statements", "db_time")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.statements = 0
+        self.db_time = 0.0
+
+
+_current = contextvars.ContextVar("request_stats", default=None)
+
+
+def current_request_stats():
+    return _current.get()
+
+
+def route_label(scope) -> str:
+    """Route template ("/admin/employee/{id}") rather than the raw path, to bound cardinality."""
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    if path:
+        return path
+    endpoint = scope.get("endpoint")
+    if endpoint is not None:
+        return getattr(endpoint, "__name__", "unknown")
+    return "unmatched"
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.total += value
+        self.count += 1
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.latency = {}
+        self.statements = {}
+        self.responses = defaultdict(int)
+        self.response_bytes = defaultdict(int)
+        self.db_time = defaultdict(float)
+
+    def observe(self, method, route, status, duration, size, stats: RequestStats):
+        key = (method, route)
+        with self._lock:
+            hist = self.latency.get(key)
+            if hist is None:
+                hist = self.latency[key] = Histogram(LATENCY_BUCKETS)
+                self.statements[key] = Histogram(STATEMENT_BUCKETS)
+            hist.observe(duration)
+            self.statements[key].observe(stats.statements)
+            self.db_time[key] += stats.db_time
+            self.responses[(method, route, status)] += 1
+            self.response_bytes[key] += size
+
+    def render(self, extra_gauges=None) -> str:
+        lines = []
+
+        def histogram(name, help_text, data):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for (method, route), hist in sorted(data.items()):
+                labels = f'method="{method}",route="{_escape(route)}"'
+                cumulative = 0
+                for bound, count in zip(hist.buckets, hist.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {hist.count}')
+                lines.append(f"{name}_sum{{{labels}}} {hist.total:.6f}")
+                lines.append(f"{name}_count{{{labels}}} {hist.count}")
+
+        with self._lock:
+            lines.append("# HELP http_requests_in_flight Requests currently being served")
+            lines.append("# TYPE http_requests_in_flight gauge")
+            lines.append(f"http_requests_in_flight {self.in_flight}")
+
+            histogram("http_request_duration_seconds", "Request latency by route", self.latency)
+            histogram("http_request_sql_statements", "SQL statements per request by route", self.statements)
+
+            lines.append("# HELP http_responses_total Responses by route and status code")
+            lines.append("# TYPE http_responses_total counter")
+            for (method, route, status), count in sorted(self.responses.items()):
+                lines.append(f'http_responses_total{{method="{method}",route="{_escape(route)}",status="{status}"}} {count}')
+
+            lines.append("# HELP http_response_size_bytes_total Response body bytes by route")
+            lines.append("# TYPE http_response_size_bytes_total counter")
+            for (method, route), size in sorted(self.response_bytes.items()):
+                lines.append(f'http_response_size_bytes_total{{method="{method}",route="{_escape(route)}"}} {size}')
+
+            lines.append("# HELP http_request_db_seconds_total Time spent in SQL by route")
+            lines.append("# TYPE http_request_db_seconds_total counter")
+            for (method, route), seconds in sorted(self.db_time.items()):
+                lines.append(f'http_request_db_seconds_total{{method="{method}",route="{_escape(route)}"}} {seconds:.6f}')
+
+        for name, value in sorted((extra_gauges or {}).items()):
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def flatten_stats(prefix: str, stats: dict) -> dict:
+    """{"audit": {"queued": 3}} -> {"panel_audit_queued": 3}, numeric leaves only."""
+    out = {}
+    for key, value in stats.items():
+        name = f"{prefix}_{key}"
+        if isinstance(value, dict):
+            out.update(flatten_stats(name, value))
+        elif isinstance(value, bool):
+            out[name] = int(value)
+        elif isinstance(value, (int, float)):
+            out[name] = value
+    return out
+
+
+metrics = Metrics()
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware (no BaseHTTPMiddleware overhead, streaming responses untouched)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestStats(scope)
+        token = _current.set(stats)
+        status_holder = [500]
+        size_holder = [0]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status_holder[0] = message["status"]
+            elif message["type"] == "http.response.body":
+                size_holder[0] += len(message.get("body", b""))
+            await send(message)
+
+        with metrics._lock:
+            metrics.in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            with metrics._lock:
+                metrics.in_flight -= 1
+            metrics.observe(scope["method"], route_label(scope), status_holder[0], duration, size_holder[0], stats)
+            _current.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None:
+        return
+    stats.statements += 1
+    start = getattr(context, "_metrics_start", None)
+    if start is not None:
+        stats.db_time += time.perf_counter() - start
+
+
+def instrument_engine(engine):
+    """Counts statements and DB time per request. Pass a sync Engine (async: engine.sync_engine)."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
@@ -0,0 +1,210 @@
+"""Versioned schema migrations for SQLite and Postgres.
+
+Usage:
+    python -m backend.migrations            apply pending migrations
+    python -m backend.migrations --status   list applied / pending versions
+    python -m backend.migrations --explain  also print hot-query plans before and after
+"""
+import sys
+from datetime import datetime, timedelta
+
+from sqlalchemy import inspect, text
+
+from . import models
+from .database import engine, SessionLocal
+
+# (name, table, columns) - names match what models.py declares for fresh databases
+HOT_PATH_INDEXES = [
+    ("ix_daily_reports_date", "daily_reports", "date"),
+    ("ix_daily_reports_employee_date", "daily_reports", "employee_id, date"),
+    ("ix_download_records_employee_start", "download_records", "employee_id, start_date"),
+    ("ix_audit_logs_timestamp", "audit_logs", "timestamp"),
+    ("ix_instagram_accounts_assigned_employee_id", "instagram_accounts", "assigned_employee_id"),
+]
+
+def _sample_params():
+    today = datetime.now().date()
+    return {"today": today, "week_ago": today - timedelta(days=6), "employee_id": 1, "ts": datetime.now()}
+
+# Queries main.py runs on every poll, with representative parameters
+HOT_QUERIES = [
+    ("daily_summary", "SELECT * FROM daily_follower_totals WHERE day = :today"),
+    ("daily_summary_detail", "SELECT * FROM daily_reports WHERE date = :today ORDER BY id LIMIT 100"),
+    ("report_status", "SELECT * FROM daily_reports WHERE employee_id = :employee_id AND date = :today"),
+    ("all_reports", "SELECT * FROM daily_reports WHERE date >= :week_ago ORDER BY date DESC, id DESC LIMIT 100"),
+    ("employee_downloads", "SELECT * FROM download_records WHERE employee_id = :employee_id AND start_date >= :week_ago"),
+    ("audit_logs", "SELECT * FROM audit_logs WHERE timestamp < :ts ORDER BY timestamp DESC, id DESC LIMIT 50"),
+    ("assigned_accounts", "SELECT * FROM instagram_accounts WHERE assigned_employee_id = :employee_id"),
+    ("unassigned_accounts", "SELECT id FROM instagram_accounts WHERE assigned_employee_id IS NULL ORDER BY id LIMIT 100"),
+]
+
+
+# --- Migrations ---
+# Each takes a Connection inside a transaction (unless listed in NON_TRANSACTIONAL).
+
+def _columns(conn, table):
+    insp = inspect(conn)
+    if table not in insp.get_table_names():
+        return None
+    return {c["name"] for c in insp.get_columns(table)}
+
+def _add_column(conn, table, column, ddl):
+    columns = _columns(conn, table)
+    # Missing table: create_all (version 4) makes it with the column already there
+    if columns is not None and column not in columns:
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+        print(f"  added {table}.{column}")
+
+def legacy_employee_columns(conn):
+    # Was migrate.py, migrate_downloads.py, migrate_passwords.py
+    _add_column(conn, "employees", "account_quota", "INTEGER DEFAULT 0")
+    _add_column(conn, "employees", "total_downloads", "INTEGER DEFAULT 0")
+    _add_column(conn, "employees", "visible_password", "VARCHAR DEFAULT ''")
+
+def legacy_account_password(conn):
+    # Was migrate_password.py
+    _add_column(conn, "instagram_accounts", "password", "VARCHAR")
+
+def download_records_from_totals(conn):
+    # Was migrate_download_records.py: move legacy totals into dated records, once
+    insp = inspect(conn)
+    tables = insp.get_table_names()
+    if "download_records" in tables or "employees" not in tables:
+        return
+    models.DownloadRecord.__table__.create(bind=conn)
+    today = datetime.now().date()
+    rows = conn.execute(text("SELECT id, total_downloads FROM employees WHERE total_downloads > 0")).fetchall()
+    for emp_id, total in rows:
+        conn.execute(
+            models.DownloadRecord.__table__.insert().values(
+                employee_id=emp_id, start_date=today, end_date=today, count=total
+            )
+        )
+    print(f"  moved {len(rows)} legacy download totals")
+
+def create_missing_tables(conn):
+    models.Base.metadata.create_all(bind=conn)
+
+def hot_path_indexes(conn):
+    concurrently = "CONCURRENTLY " if conn.dialect.name == "postgresql" else ""
+    for name, table, columns in HOT_PATH_INDEXES:
+        conn.execute(text(f"CREATE INDEX {concurrently}IF NOT EXISTS {name} ON {table} ({columns})"))
+        print(f"  index {name}")
+
+def backfill_download_rollup(conn):
+    from .rollups import ensure_download_rollup
+    db = SessionLocal(bind=conn)
+    rows = ensure_download_rollup(db)
+    if rows is not None:
+        print(f"  download rollup backfilled: {rows} rows")
+
+def backfill_download_totals(conn):
+    models.Base.metadata.create_all(bind=conn, tables=[models.DownloadDailyTotal.__table__])
+    backfill_download_rollup(conn)
+
+def employee_counters(conn):
+    from .counters import recompute
+    _add_column(conn, "employees", "assigned_count", "INTEGER DEFAULT 0")
+    rows = recompute(conn)
+    print(f"  counters recomputed for {rows} employees")
+
+def backfill_report_totals(conn):
+    from .rollups import ensure_report_totals
+    models.Base.metadata.create_all(bind=conn, tables=[
+        models.DailyFollowerTotal.__table__, models.EmployeeDailyFollowerTotal.__table__
+    ])
+    db = SessionLocal(bind=conn)
+    days = ensure_report_totals(db)
+    if days is not None:
+        print(f"  follower totals backfilled: {days} days")
+
+
+MIGRATIONS = [
+    (1, "legacy_employee_columns", legacy_employee_columns),
+    (2, "legacy_account_password", legacy_account_password),
+    (3, "download_records_from_totals", download_records_from_totals),
+    (4, "create_missing_tables", create_missing_tables),
+    (5, "hot_path_indexes", hot_path_indexes),
+    (6, "backfill_download_rollup", backfill_download_rollup),
+    (7, "employee_counters", employee_counters),
+    (8, "backfill_report_totals", backfill_report_totals),
+    (9, "backfill_download_totals", backfill_download_totals),
+]
+
+# CREATE INDEX CONCURRENTLY can't run inside a transaction block on Postgres
+NON_TRANSACTIONAL = {"hot_path_indexes"}
+
+
+# --- Runner ---
+
+def _ensure_version_table(conn):
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations ("
+        "version INTEGER PRIMARY KEY, name VARCHAR NOT NULL, applied_at TIMESTAMP NOT NULL)"
+    ))
+
+def applied_versions():
+    with engine.begin() as conn:
+        _ensure_version_table(conn)
+        return {v for (v,) in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+def _record(conn, version, name):
+    conn.execute(
+        text("INSERT INTO schema_migrations (version, name, applied_at) VALUES (:v, :n, :t)"),
+        {"v": version, "n": name, "t": datetime.now()}
+    )
+
+def run_migrations():
+    done = applied_versions()
+    pending = [m for m in MIGRATIONS if m[0] not in done]
+    if not pending:
+        print("Schema is up to date.")
+        return []
+
+    for version, name, fn in pending:
+        print(f"Applying {version:03d} {name}...")
+        if name in NON_TRANSACTIONAL and engine.dialect.name == "postgresql":
+            with engine.connect() as conn:
+                fn(conn.execution_options(isolation_level="AUTOCOMMIT"))
+            with engine.begin() as conn:
+                _record(conn, version, name)
+        else:
+            with engine.begin() as conn:
+                fn(conn)
+                _record(conn, version, name)
+    print(f"Applied {len(pending)} migration(s).")
+    return [m[0] for m in pending]
+
+
+def explain_hot_queries(label: str):
+    prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+    params = _sample_params()
+    tables = set(inspect(engine).get_table_names())
+    print(f"\n=== Query plans ({label}) ===")
+    with engine.connect() as conn:
+        for name, sql in HOT_QUERIES:
+            table = sql.split(" FROM ", 1)[1].split()[0]
+            if table not in tables:
+                print(f"-- {name}: table {table} missing")
+                continue
+            print(f"-- {name}: {sql}")
+            for row in conn.execute(text(prefix + sql), params):
+                print("   " + " | ".join(str(c) for c in row))
+
+
+def status():
+    done = applied_versions()
+    for version, name, _ in MIGRATIONS:
+        print(f"{version:03d} {name}: {'applied' if version in done else 'pending'}")
+
+
+if __name__ == "__main__":
+    if "--status" in sys.argv:
+        status()
+    else:
+        explain = "--explain" in sys.argv
+        if explain:
+            explain_hot_queries("before")
+        run_migrations()
+        if explain:
+            explain_hot_queries("after")
@@ -1,5 +1,5 @@
 
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String, Date, DateTime, UniqueConstraint
+from sqlalchemy import Boolean, Column, ForeignKey, Index, Integer, String, Date, DateTime, UniqueConstraint
 from sqlalchemy.orm import relationship
 from .database import Base
 from datetime import datetime
@@ -26,6 +26,42 @@ class DownloadRecord(Base):
 
     employee = relationship("Employee", back_populates="download_records")
 
+    __table_args__ = (
+        Index("ix_download_records_employee_start", "employee_id", "start_date"),
+    )
+
+class DownloadDailyRollup(Base):
+    """Summed download counts per employee per day (keyed on DownloadRecord.start_date)."""
+    __tablename__ = "download_daily_rollups"
+
+    employee_id = Column(Integer, ForeignKey("employees.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    count = Column(Integer, default=0)
+
+class DownloadDailyTotal(Base):
+    """Summed download counts per day over all records, including ones detached from a deleted employee."""
+    __tablename__ = "download_daily_totals"
+
+    day = Column(Date, primary_key=True)
+    count = Column(Integer, default=0)
+
+class DailyFollowerTotal(Base):
+    """Sum of follower_count and number of reports per day, kept current by the report write paths."""
+    __tablename__ = "daily_follower_totals"
+
+    day = Column(Date, primary_key=True)
+    total_followers = Column(Integer, default=0)
+    report_count = Column(Integer, default=0)
+
+class EmployeeDailyFollowerTotal(Base):
+    """Same as DailyFollowerTotal, per employee."""
+    __tablename__ = "employee_daily_follower_totals"
+
+    employee_id = Column(Integer, ForeignKey("employees.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    total_followers = Column(Integer, default=0)
+    report_count = Column(Integer, default=0)
+
 class Employee(Base):
     __tablename__ = "employees"
 
@@ -34,7 +70,9 @@ class Employee(Base):
     full_name = Column(String)
     visible_password = Column(String, default="")
     account_quota = Column(Integer, default=0)
-    total_downloads = Column(Integer, default=0) # Kept for legacy but unused
+    # Maintained counters (counters.py): sum of download_records.count, number of assigned accounts
+    total_downloads = Column(Integer, default=0)
+    assigned_count = Column(Integer, default=0)
 
     user = relationship("User", back_populates="employee")
     assigned_accounts = relationship("InstagramAccount", back_populates="assigned_employee")
@@ -56,7 +94,7 @@ class InstagramAccount(Base):
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String, unique=True, index=True)
     password = Column(String)
-    assigned_employee_id = Column(Integer, ForeignKey("employees.id"), nullable=True)
+    assigned_employee_id = Column(Integer, ForeignKey("employees.id"), nullable=True, index=True)
 
     assigned_employee = relationship("Employee", back_populates="assigned_accounts")
     reports = relationship("DailyReport", back_populates="account")
@@ -69,7 +107,7 @@ class AuditLog(Base):
     action = Column(String)
     details = Column(String)
     ip_address = Column(String)
-    timestamp = Column(DateTime, default=datetime.now)
+    timestamp = Column(DateTime, default=datetime.now, index=True)
 
     user = relationship("User", back_populates="audit_logs")
 
@@ -80,7 +118,7 @@ class DailyReport(Base):
     id = Column(Integer, primary_key=True, index=True)
     employee_id = Column(Integer, ForeignKey("employees.id"))
     instagram_account_id = Column(Integer, ForeignKey("instagram_accounts.id"))
-    date = Column(Date)
+    date = Column(Date, index=True)
     follower_count = Column(Integer)
     locked = Column(Boolean, default=False)
 
@@ -89,4 +127,5 @@ class DailyReport(Base):
 
     __table_args__ = (
         UniqueConstraint('employee_id', 'instagram_account_id', 'date', name='unique_daily_report'),
+        Index("ix_daily_reports_employee_date", "employee_id", "date"),
     )
@@ -0,0 +1,71 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+from .database import engine
+
+STREAM_CHUNK_SIZE = 1000
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def encode_cursor(value, row_id: int) -> str:
+    """Keyset cursor for the last row of a page: '<sort value>|<id>'."""
+    if isinstance(value, (date, datetime)):
+        value = value.isoformat()
+    return f"{value}|{row_id}"
+
+
+def decode_cursor(cursor: str, parse):
+    """Splits a cursor into (parsed sort value, id). Raises 400 on a malformed cursor."""
+    try:
+        value, row_id = cursor.rsplit("|", 1)
+        return parse(value), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def _iter_export(stmt, to_dict, fmt: str, columns):
+    # Own connection: the request session is closed before the body is streamed
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True).execute(stmt)
+        if fmt == "csv":
+            buf = io.StringIO()
+            writer = csv.writer(buf)
+            writer.writerow(columns)
+            yield buf.getvalue()
+
+        for rows in result.partitions(STREAM_CHUNK_SIZE):
+            if fmt == "csv":
+                buf = io.StringIO()
+                writer = csv.writer(buf)
+                for row in rows:
+                    item = to_dict(row)
+                    writer.writerow([item[c] for c in columns])
+                yield buf.getvalue()
+            else:
+                yield "".join(json.dumps(to_dict(row), default=_json_default) + "\n" for row in rows)
+
+
+def stream_rows(stmt, to_dict, fmt: str, columns, filename: str):
+    """Streams a Core select as NDJSON or CSV, reading it with a server-side cursor."""
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {fmt}")
+    return StreamingResponse(
+        _iter_export(stmt, to_dict, fmt, columns),
+        media_type=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'}
+    )
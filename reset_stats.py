@@ -8,9 +8,14 @@ try:
     # Delete all download records
     num_downloads = db.query(models.DownloadRecord).delete()
     print(f"Deleted {num_downloads} download records.")
+    db.query(models.DownloadDailyRollup).delete()
+    db.query(models.DownloadDailyTotal).delete()
+    db.query(models.Employee).update({models.Employee.total_downloads: 0})
 
     # Delete all daily reports
     num_reports = db.query(models.DailyReport).delete()
+    db.query(models.DailyFollowerTotal).delete()
+    db.query(models.EmployeeDailyFollowerTotal).delete()
     print(f"Deleted {num_reports} daily reports.")
 
     # Reset auto-increment counters (sqlite specific) if needed, but not strictly necessary for functionality.
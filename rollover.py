@@ -0,0 +1,96 @@
+import threading
+from datetime import datetime, timedelta
+
+import pytz
+from sqlalchemy.orm import Session
+
+from . import cache
+from . import models
+from .database import SessionLocal
+from .events import event_broker
+
+ISTANBUL_TZ = pytz.timezone("Europe/Istanbul")
+
+# Run a little after midnight so the new day is unambiguous
+ROLLOVER_DELAY_SECONDS = 5
+
+
+def get_today_date():
+    return datetime.now(ISTANBUL_TZ).date()
+
+def is_report_locked(locked: bool, report_date, today=None) -> bool:
+    """A report is read-only once locked or once its day is over, even before rollover ran."""
+    if today is None:
+        today = get_today_date()
+    return bool(locked) or report_date < today
+
+def lock_past_reports(db: Session):
+    """Locks any unlocked report that is not from today."""
+    today = get_today_date()
+    # Find records where date < today and locked=False
+    count = db.query(models.DailyReport).filter(
+        models.DailyReport.date < today,
+        models.DailyReport.locked == False
+    ).update({models.DailyReport.locked: True}, synchronize_session=False)
+    db.commit()
+    if count:
+        event_broker.publish("rollover", {"date": str(today), "locked": count})
+    return count
+
+def seconds_until_next_rollover(now=None):
+    now = now or datetime.now(ISTANBUL_TZ)
+    tomorrow = (now + timedelta(days=1)).date()
+    midnight = ISTANBUL_TZ.localize(datetime(tomorrow.year, tomorrow.month, tomorrow.day))
+    return max(0.0, (midnight - now).total_seconds()) + ROLLOVER_DELAY_SECONDS
+
+
+class RolloverScheduler:
+    """Locks the previous day's reports once per day at Istanbul midnight."""
+
+    def __init__(self):
+        self._stop = threading.Event()
+        self._thread = None
+        self.last_run = None
+        self.last_locked = 0
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        # Catch up on days missed while the app was down
+        self.run_once()
+        self._thread = threading.Thread(target=self._run, name="report-rollover", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(5)
+            self._thread = None
+
+    def run_once(self):
+        db = SessionLocal()
+        try:
+            self.last_locked = lock_past_reports(db)
+            if self.last_locked:
+                cache.bump(cache.REPORTS)
+            self.last_run = datetime.now(ISTANBUL_TZ)
+        except Exception as e:
+            db.rollback()
+            print(f"Rollover error: {e}")
+        finally:
+            db.close()
+
+    def _run(self):
+        while not self._stop.wait(seconds_until_next_rollover()):
+            self.run_once()
+
+    def stats(self):
+        return {
+            "last_run": self.last_run.isoformat() if self.last_run else None,
+            "last_locked": self.last_locked,
+            "next_run_in_seconds": int(seconds_until_next_rollover()),
+        }
+
+
+rollover_scheduler = RolloverScheduler()
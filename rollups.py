@@ -0,0 +1,165 @@
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+
+from . import models
+from .database import SessionLocal, engine, get_dialect_insert
+
+
+def _download_targets(employee_id, day):
+    """(model, primary key values) of the rollup rows a download record starting on `day` counts towards."""
+    targets = [(models.DownloadDailyTotal, {"day": day})]
+    if employee_id is not None:
+        targets.append((models.DownloadDailyRollup, {"employee_id": employee_id, "day": day}))
+    return targets
+
+
+def add_download_rollup(db: Session, employee_id, day, count: int):
+    """Adds `count` to the day total and the (employee_id, day) rollup row. Does not commit."""
+    dialect_insert = get_dialect_insert(db)
+    for model, keys in _download_targets(employee_id, day):
+        if dialect_insert is not None:
+            stmt = dialect_insert(model).values(count=count, **keys)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[getattr(model, k) for k in keys],
+                set_={"count": model.count + stmt.excluded.count}
+            )
+            db.execute(stmt)
+            continue
+
+        # Other databases: update first, insert if nothing was there yet
+        updated = db.query(model).filter(*[getattr(model, k) == v for k, v in keys.items()])\
+            .update({model.count: model.count + count}, synchronize_session=False)
+        if not updated:
+            db.add(model(count=count, **keys))
+            db.flush()
+
+
+def _report_total_targets(employee_id, day):
+    """(model, primary key values) of the total rows a report on `day` counts towards."""
+    targets = [(models.DailyFollowerTotal, {"day": day})]
+    if employee_id is not None:
+        targets.append((models.EmployeeDailyFollowerTotal, {"employee_id": employee_id, "day": day}))
+    return targets
+
+
+def report_totals_statements(dialect_insert, employee_id, day, follower_delta: int, report_delta: int):
+    """ON CONFLICT upserts adding the deltas to the day and (employee, day) follower totals."""
+    stmts = []
+    for model, keys in _report_total_targets(employee_id, day):
+        stmt = dialect_insert(model).values(total_followers=follower_delta, report_count=report_delta, **keys)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[getattr(model, k) for k in keys],
+            set_={
+                "total_followers": model.total_followers + stmt.excluded.total_followers,
+                "report_count": model.report_count + stmt.excluded.report_count
+            }
+        )
+        stmts.append(stmt)
+    return stmts
+
+
+def add_report_totals(db: Session, employee_id, day, follower_delta: int, report_delta: int = 0):
+    """Applies a report write to the follower totals. Does not commit.
+
+    New report: (count, 1). Updated report: (new - old, 0).
+    """
+    if not follower_delta and not report_delta:
+        return
+    dialect_insert = get_dialect_insert(db)
+    if dialect_insert is not None:
+        for stmt in report_totals_statements(dialect_insert, employee_id, day, follower_delta, report_delta):
+            db.execute(stmt)
+        return
+
+    # Other databases: update first, insert if nothing was there yet
+    for model, keys in _report_total_targets(employee_id, day):
+        updated = db.query(model).filter(*[getattr(model, k) == v for k, v in keys.items()]).update({
+            model.total_followers: model.total_followers + follower_delta,
+            model.report_count: model.report_count + report_delta
+        }, synchronize_session=False)
+        if not updated:
+            db.add(model(total_followers=follower_delta, report_count=report_delta, **keys))
+            db.flush()
+
+
+def rebuild_report_totals(db: Session):
+    """Recomputes both follower total tables from daily_reports."""
+    Report = models.DailyReport
+    db.query(models.DailyFollowerTotal).delete(synchronize_session=False)
+    db.query(models.EmployeeDailyFollowerTotal).delete(synchronize_session=False)
+    db.execute(
+        insert(models.DailyFollowerTotal).from_select(
+            ["day", "total_followers", "report_count"],
+            select(Report.date, func.coalesce(func.sum(Report.follower_count), 0), func.count(Report.id))
+            .where(Report.date != None)
+            .group_by(Report.date)
+        )
+    )
+    db.execute(
+        insert(models.EmployeeDailyFollowerTotal).from_select(
+            ["employee_id", "day", "total_followers", "report_count"],
+            select(Report.employee_id, Report.date, func.coalesce(func.sum(Report.follower_count), 0), func.count(Report.id))
+            .where(Report.employee_id != None, Report.date != None)
+            .group_by(Report.employee_id, Report.date)
+        )
+    )
+    db.commit()
+    return db.query(func.count()).select_from(models.DailyFollowerTotal).scalar()
+
+
+def ensure_report_totals(db: Session):
+    """Backfills the follower totals if they are empty but reports exist."""
+    has_totals = db.query(models.DailyFollowerTotal.day).first() is not None
+    has_reports = db.query(models.DailyReport.id).first() is not None
+    if has_reports and not has_totals:
+        return rebuild_report_totals(db)
+    return None
+
+
+def rebuild_download_rollup(db: Session):
+    """Recomputes the per-employee rollup and the day totals from download_records."""
+    Rollup = models.DownloadDailyRollup
+    Record = models.DownloadRecord
+
+    db.query(Rollup).delete(synchronize_session=False)
+    db.query(models.DownloadDailyTotal).delete(synchronize_session=False)
+    db.execute(
+        insert(models.DownloadDailyTotal).from_select(
+            ["day", "count"],
+            select(Record.start_date, func.sum(Record.count))
+            .where(Record.start_date != None)
+            .group_by(Record.start_date)
+        )
+    )
+    db.execute(
+        insert(Rollup).from_select(
+            ["employee_id", "day", "count"],
+            select(Record.employee_id, Record.start_date, func.sum(Record.count))
+            .where(Record.employee_id != None, Record.start_date != None)
+            .group_by(Record.employee_id, Record.start_date)
+        )
+    )
+    db.commit()
+    return db.query(func.count()).select_from(Rollup).scalar()
+
+
+def ensure_download_rollup(db: Session):
+    """Backfills the rollups if they are empty but download records exist."""
+    # The day totals hold a row for every record with a start date, so they are the emptiness check
+    has_rollup = db.query(models.DownloadDailyTotal.day).first() is not None
+    has_records = db.query(models.DownloadRecord.id).first() is not None
+    if has_records and not has_rollup:
+        return rebuild_download_rollup(db)
+    return None
+
+
+if __name__ == "__main__":
+    models.Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        rows = rebuild_download_rollup(db)
+        print(f"Download rollup rebuilt: {rows} rows.")
+        days = rebuild_report_totals(db)
+        print(f"Follower totals rebuilt: {days} days.")
+    finally:
+        db.close()
@@ -0,0 +1,81 @@
+from typing import Dict, List, Optional
+from pydantic import BaseModel
+
+class EmployeeCreate(BaseModel):
+    username: str
+    password: str
+    full_name: str
+    role: str = "employee"
+
+class InstagramAccountCreate(BaseModel):
+    username: str
+    password: str
+
+class QuotaRequest(BaseModel):
+    employee_id: int
+    amount: int
+
+class BulkAccountCreate(BaseModel):
+    accounts: List[InstagramAccountCreate]
+
+class AssignRequest(BaseModel):
+    # Single employee: `limit` accounts to `employee_id` (original behaviour)
+    employee_id: Optional[int] = None
+    limit: Optional[int] = 10
+    # Many employees: "fill" (up to account_quota), "round_robin" or "weighted";
+    # `limit` then caps the total handed out (null = everything available)
+    employee_ids: Optional[List[int]] = None
+    mode: str = "round_robin"
+    weights: Optional[Dict[int, float]] = None
+
+class ReportCreate(BaseModel):
+    instagram_account_id: int
+    follower_count: int
+
+class Token(BaseModel):
+    access_token: str
+    token_type: str
+    role: str
+
+class AccountOut(BaseModel):
+    id: int
+    username: str
+    
+    class Config:
+        orm_mode = True
+
+class AccountWithPasswordOut(BaseModel):
+    id: int
+    username: str
+    password: str
+    
+    class Config:
+        orm_mode = True
+
+class EmployeeDashboardData(BaseModel):
+    quota: int
+    assigned_accounts: List[AccountWithPasswordOut]
+
+class EmployeeOut(BaseModel):
+    id: int
+    full_name: str
+    user_name: str
+    visible_password: Optional[str] = None
+    account_quota: int = 0
+    assigned_count: int = 0
+
+class EmployeeDetailOut(BaseModel):
+    id: int
+    full_name: str
+    user_name: str
+    assigned_accounts: List[AccountWithPasswordOut]
+
+class ReportOut(BaseModel):
+    id: int
+    employee_id: int
+    instagram_account_id: int
+    date: str
+    follower_count: int
+    locked: bool
+    account_username: str
+    employee_name: str
@@ -2,7 +2,15 @@
 from .database import SessionLocal, engine, Base
 from . import models
 from .auth import get_password_hash
+from .rollups import rebuild_download_rollup, rebuild_report_totals
+from .counters import recompute
+from sqlalchemy import func, insert, text
+from datetime import date, datetime, timedelta
+import argparse
+import math
 import os
+import random
+import time
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -38,5 +46,200 @@ def seed_db():
         
     db.close()
 
-if __name__ == "__main__":
+# --- Synthetic large-tenant data ---
+
+FIRST_NAMES = ["Ahmet", "Mehmet", "Ayse", "Fatma", "Ali", "Zeynep", "Mustafa", "Elif", "Emre", "Merve",
+               "Burak", "Selin", "Can", "Ece", "Deniz", "Cem", "Gizem", "Kerem", "Derya", "Onur"]
+LAST_NAMES = ["Yilmaz", "Kaya", "Demir", "Sahin", "Celik", "Yildiz", "Aydin", "Ozturk", "Arslan", "Dogan",
+              "Kilic", "Aslan", "Cetin", "Kara", "Koc", "Kurt", "Ozdemir", "Simsek", "Polat", "Erdem"]
+AUDIT_ACTIONS = ["LOGIN", "SUBMIT_REPORT", "UPDATE_REPORT", "UPDATE_ACCOUNT"]
+
+BATCH_SIZE = 5000
+
+
+def _next_id(db, model):
+    return (db.query(func.max(model.id)).scalar() or 0) + 1
+
+
+def _bulk_insert(db, model, rows):
+    """Executemany INSERT in BATCH_SIZE slices; rows may be any iterable (generators stay lazy)."""
+    table = model.__table__
+    batch = []
+    total = 0
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            db.execute(insert(table), batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        db.execute(insert(table), batch)
+        total += len(batch)
+    db.commit()
+    return total
+
+
+def _sync_sequences(db, seeded_models):
+    """Moves Postgres SERIAL sequences past the explicit ids inserted above (no-op elsewhere)."""
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    for model in seeded_models:
+        table = model.__tablename__
+        db.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {table}), 1), (SELECT MAX(id) FROM {table}) IS NOT NULL)"
+        ))
+    db.commit()
+
+
+def _assignment_weights(rng, employees: int, skew: float):
+    # Zipf-like: a few employees hold most accounts, like production
+    weights = [1.0 / math.pow(rank + 1, skew) for rank in range(employees)]
+    rng.shuffle(weights)
+    return weights
+
+
+def generate_dataset(employees=50, accounts=5000, days=90, seed=42, end_date=None,
+                     assigned_ratio=0.9, report_ratio=0.95, skew=0.8, audit_per_day=200, prefix="synth"):
+    """Fills the schema with a deterministic synthetic tenant (same seed + end_date = same data)."""
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(seed)
+    end_date = end_date or date.today()
+    start_date = end_date - timedelta(days=days - 1)
+    db = SessionLocal()
+    started = time.perf_counter()
+
+    def step(label, count):
+        print(f"  {label}: {count} rows ({time.perf_counter() - started:.1f}s)")
+
+    try:
+        # Users + employees (one hash for everyone: hashing is the slow part otherwise)
+        password = "password"
+        password_hash = get_password_hash(password)
+        first_user = _next_id(db, models.User)
+        first_emp = _next_id(db, models.Employee)
+        user_ids = list(range(first_user, first_user + employees))
+        emp_ids = list(range(first_emp, first_emp + employees))
+        step("users", _bulk_insert(db, models.User, (
+            {"id": uid, "username": f"{prefix}_emp{i:05d}", "password_hash": password_hash, "role": "employee"}
+            for i, uid in enumerate(user_ids)
+        )))
+
+        weights = _assignment_weights(rng, employees, skew)
+        assigned_target = int(accounts * assigned_ratio)
+        owners = rng.choices(emp_ids, weights=weights, k=assigned_target) if employees else []
+        per_emp = {}
+        for owner in owners:
+            per_emp[owner] = per_emp.get(owner, 0) + 1
+
+        step("employees", _bulk_insert(db, models.Employee, (
+            {
+                "id": eid,
+                "user_id": uid,
+                "full_name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                "visible_password": password,
+                "account_quota": per_emp.get(eid, 0) + rng.randint(0, 50),
+            }
+            for eid, uid in zip(emp_ids, user_ids)
+        )))
+
+        # Accounts: the first `assigned_target` get owners, the rest stay unassigned
+        first_acc = _next_id(db, models.InstagramAccount)
+        acc_owner = {}
+        for j in range(accounts):
+            acc_owner[first_acc + j] = owners[j] if j < assigned_target else None
+        step("instagram_accounts", _bulk_insert(db, models.InstagramAccount, (
+            {"id": acc_id, "username": f"{prefix}_ig{acc_id:08d}", "password": f"pw{rng.randrange(10**6):06d}",
+             "assigned_employee_id": owner}
+            for acc_id, owner in acc_owner.items()
+        )))
+
+        # Daily reports: follower counts that grow with noise and occasional dips
+        def report_rows():
+            for acc_id, owner in acc_owner.items():
+                if owner is None:
+                    continue
+                followers = int(rng.lognormvariate(8.5, 1.0))
+                growth = rng.uniform(-0.002, 0.01)
+                for d in range(days):
+                    day = start_date + timedelta(days=d)
+                    followers = max(0, int(followers * (1 + growth + rng.gauss(0, 0.004))))
+                    if rng.random() > report_ratio:
+                        continue
+                    yield {
+                        "employee_id": owner,
+                        "instagram_account_id": acc_id,
+                        "date": day,
+                        "follower_count": followers,
+                        "locked": day < end_date,
+                    }
+        step("daily_reports", _bulk_insert(db, models.DailyReport, report_rows()))
+
+        # Weekly download records per employee
+        def download_rows():
+            for eid in emp_ids:
+                day = start_date
+                while day <= end_date:
+                    week_end = min(day + timedelta(days=6), end_date)
+                    yield {
+                        "employee_id": eid,
+                        "start_date": day,
+                        "end_date": week_end,
+                        "count": rng.randint(0, 40) * max(1, per_emp.get(eid, 0) // 20),
+                        "created_at": datetime.combine(week_end, datetime.min.time()) + timedelta(hours=18),
+                    }
+                    day = week_end + timedelta(days=1)
+        step("download_records", _bulk_insert(db, models.DownloadRecord, download_rows()))
+
+        def audit_rows():
+            for d in range(days):
+                day = start_date + timedelta(days=d)
+                for _ in range(audit_per_day):
+                    uid = rng.choice(user_ids)
+                    yield {
+                        "user_id": uid,
+                        "action": rng.choice(AUDIT_ACTIONS),
+                        "details": "synthetic",
+                        "ip_address": f"10.0.{rng.randrange(256)}.{rng.randrange(256)}",
+                        "timestamp": datetime.combine(day, datetime.min.time()) + timedelta(seconds=rng.randrange(86400)),
+                    }
+        step("audit_logs", _bulk_insert(db, models.AuditLog, audit_rows()))
+        _sync_sequences(db, [models.User, models.Employee, models.InstagramAccount,
+                             models.DailyReport, models.DownloadRecord, models.AuditLog])
+
+        step("download_daily_rollups", rebuild_download_rollup(db))
+        step("daily_follower_totals", rebuild_report_totals(db))
+        # assigned_count / total_downloads from the rows inserted above
+        step("employee counters", recompute(db, emp_ids))
+        db.commit()
+        print(f"Synthetic dataset ready in {time.perf_counter() - started:.1f}s.")
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed the admin user, optionally with a synthetic large tenant.")
+    parser.add_argument("--synthetic", action="store_true", help="generate synthetic data after seeding the admin")
+    parser.add_argument("--employees", type=int, default=50)
+    parser.add_argument("--accounts", type=int, default=5000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--end-date", type=date.fromisoformat, default=None, help="last report day (default: today)")
+    parser.add_argument("--assigned-ratio", type=float, default=0.9)
+    parser.add_argument("--report-ratio", type=float, default=0.95)
+    parser.add_argument("--skew", type=float, default=0.8, help="zipf exponent of the assignment distribution")
+    parser.add_argument("--audit-per-day", type=int, default=200)
+    parser.add_argument("--prefix", default="synth", help="username prefix (must be unique per run)")
+    args = parser.parse_args()
+
     seed_db()
+    if args.synthetic:
+        generate_dataset(
+            employees=args.employees, accounts=args.accounts, days=args.days, seed=args.seed,
+            end_date=args.end_date, assigned_ratio=args.assigned_ratio, report_ratio=args.report_ratio,
+            skew=args.skew, audit_per_day=args.audit_per_day, prefix=args.prefix,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""Slow-query recorder.
+
+Statements slower than SLOW_QUERY_MS are kept in a bounded ring buffer and
+grouped by normalized SQL. The first time a SELECT shows up as slow, its plan
+(EXPLAIN QUERY PLAN on SQLite, EXPLAIN on Postgres) is captured on the same
+connection; the entry is kept with plan None if that fails.
+"""
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime
+
+from sqlalchemy import event
+
+from .metrics import current_request_stats, route_label
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 200))
+SLOW_QUERY_BUFFER = int(os.getenv("SLOW_QUERY_BUFFER", 200))
+SLOW_QUERY_GROUPS = int(os.getenv("SLOW_QUERY_GROUPS", 500))
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM_LIST = re.compile(r"\((?:\s*(?:\?|%\(\w+\)s|:\w+|\$\d+|%s)\s*,)+\s*(?:\?|%\(\w+\)s|:\w+|\$\d+|%s)\s*\)")
+
+
+def normalize(statement: str) -> str:
+    sql = _WHITESPACE.sub(" ", statement).strip()
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    # IN (?, ?, ?, ...) of any length is the same statement
+    return _PARAM_LIST.sub("(...)", sql)
+
+
+def param_shape(parameters, executemany: bool):
+    if executemany:
+        rows = list(parameters or [])
+        return {"executemany": len(rows), "row": param_shape(rows[0], False) if rows else None}
+    if isinstance(parameters, dict):
+        return {k: type(v).__name__ for k, v in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(v).__name__ for v in parameters]
+    return type(parameters).__name__
+
+
+def _explain(conn, statement, parameters):
+    dialect_name = conn.dialect.name
+    if dialect_name == "sqlite":
+        prefix = "EXPLAIN QUERY PLAN "
+    elif dialect_name == "postgresql":
+        prefix = "EXPLAIN "
+    else:
+        return None
+    # The pool's DBAPI connection: the driver's own, or the sync-style adapter of an async driver
+    # (their cursors have no .connection back-reference)
+    dbapi_conn = conn.connection.dbapi_connection
+    cur = dbapi_conn.cursor()
+    savepoint = dialect_name == "postgresql"
+    try:
+        # A failed EXPLAIN must not abort the caller's Postgres transaction
+        if savepoint:
+            cur.execute("SAVEPOINT slowlog_explain")
+        try:
+            cur.execute(prefix + statement, parameters)
+            rows = cur.fetchall()
+        except Exception as e:
+            if savepoint:
+                cur.execute("ROLLBACK TO SAVEPOINT slowlog_explain")
+            return [f"EXPLAIN failed: {e}"]
+        if savepoint:
+            cur.execute("RELEASE SAVEPOINT slowlog_explain")
+        return [" | ".join(str(c) for c in row) for row in rows]
+    finally:
+        cur.close()
+
+
+class SlowQueryLog:
+    def __init__(self, threshold_ms=SLOW_QUERY_MS, buffer_size=SLOW_QUERY_BUFFER, max_groups=SLOW_QUERY_GROUPS):
+        self.threshold = threshold_ms / 1000.0
+        self.max_groups = max_groups
+        self._recent = deque(maxlen=buffer_size)
+        self._groups = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        context._slowlog_start = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, "_slowlog_start", None)
+        if start is None:
+            return
+        duration = time.perf_counter() - start
+        if duration < self.threshold:
+            return
+        try:
+            self.record(conn, cursor, statement, parameters, executemany, duration)
+        except Exception as e:
+            print(f"Slow query log error: {e}")
+
+    def record(self, conn, cursor, statement, parameters, executemany, duration):
+        key = normalize(statement)
+        stats = current_request_stats()
+        route = route_label(stats.scope) if stats is not None else "background"
+
+        entry = {
+            "at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "duration_ms": round(duration * 1000, 2),
+            "route": route,
+            "statement": key,
+            "params": param_shape(parameters, executemany),
+        }
+        needs_plan = False
+        with self._lock:
+            self._recent.append(entry)
+            group = self._groups.get(key)
+            if group is None:
+                needs_plan = True
+                group = self._groups[key] = {
+                    "statement": key,
+                    "sample": statement,
+                    "params": entry["params"],
+                    "plan": None,
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "routes": {},
+                }
+                while len(self._groups) > self.max_groups:
+                    self._groups.popitem(last=False)
+            self._groups.move_to_end(key)
+            group["count"] += 1
+            group["total_ms"] = round(group["total_ms"] + entry["duration_ms"], 2)
+            group["max_ms"] = max(group["max_ms"], entry["duration_ms"])
+            group["last_seen"] = entry["at"]
+            group["routes"][route] = group["routes"].get(route, 0) + 1
+
+        # The statement and its timing are recorded above; a plan is extra
+        if needs_plan and not executemany and statement.lstrip()[:6].upper() in ("SELECT", "WITH "):
+            try:
+                plan = _explain(conn, statement, parameters)
+            except Exception as e:
+                print(f"Slow query EXPLAIN error: {e}")
+                plan = None
+            with self._lock:
+                group["plan"] = plan
+
+    def snapshot(self, limit=50):
+        with self._lock:
+            groups = sorted(self._groups.values(), key=lambda g: g["total_ms"], reverse=True)[:limit]
+            return {
+                "threshold_ms": self.threshold * 1000,
+                "groups": [dict(g, routes=dict(g["routes"])) for g in groups],
+                "recent": list(self._recent)[-limit:][::-1],
+            }
+
+    def clear(self):
+        with self._lock:
+            self._recent.clear()
+            self._groups.clear()
+
+    def install(self, engine):
+        """Attach to a sync Engine (for an AsyncEngine pass engine.sync_engine)."""
+        event.listen(engine, "before_cursor_execute", self._before)
+        event.listen(engine, "after_cursor_execute", self._after)
+
+
+slow_query_log = SlowQueryLog()
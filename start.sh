@@ -1,7 +1,7 @@
 #!/bin/bash
 
 # Apply migrations
-python backend/clean_migrate.py
+python -m backend.clean_migrate
 
 # Start application
 # Host 0.0.0.0 is needed for Render
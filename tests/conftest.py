@@ -0,0 +1,115 @@
+"""Test setup: the app runs against a throwaway SQLite file.
+
+The repository root is the `backend` package (production imports backend.main),
+so it is registered under that name before anything imports it. DATABASE_URL has
+to be set first because the engine is built on import. DATABASE_ASYNC is left as
+the caller set it, so `DATABASE_ASYNC=1 pytest` runs the suite against the async
+routes; tests/test_employee_routes.py does that run from a plain `pytest`.
+"""
+import importlib.util
+import os
+import sys
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+TMP_DIR = tempfile.mkdtemp(prefix="panel-tests-")
+
+os.environ["DATABASE_URL"] = f"sqlite:///{TMP_DIR}/test.db"
+# Hashing cost is irrelevant here and dominates login-heavy tests otherwise
+os.environ["PASSWORD_HASH_ROUNDS"] = "1000"
+
+if "backend" not in sys.modules:
+    spec = importlib.util.spec_from_file_location("backend", ROOT / "__init__.py", submodule_search_locations=[str(ROOT)])
+    package = importlib.util.module_from_spec(spec)
+    sys.modules["backend"] = package
+    spec.loader.exec_module(package)
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from backend import auth, cache, main, models, seed  # noqa: E402
+from backend.database import Base, SessionLocal, engine  # noqa: E402
+from backend.rollover import get_today_date  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    # Entering the client runs the startup hooks (migrations, audit writer, scheduler)
+    with TestClient(main.app) as c:
+        yield c
+
+
+@pytest.fixture
+def db(client):
+    """Empty tables plus the admin user; response and principal caches cleared."""
+    with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+    seed.seed_db()
+    cache.response_cache.clear()
+    auth.principal_cache.clear()
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def synth(db):
+    """Generates a small synthetic tenant; returns the generator for more data."""
+    def generate(employees=4, accounts=60, days=5, prefix="synth", seed_value=42):
+        # Ends yesterday so today's reports are created by the tests themselves
+        seed.generate_dataset(employees=employees, accounts=accounts, days=days, seed=seed_value,
+                              end_date=get_today_date() - timedelta(days=1), audit_per_day=5, prefix=prefix)
+        cache.response_cache.clear()
+        db.expire_all()
+    return generate
+
+
+def token_headers(username):
+    return {"Authorization": f"Bearer {auth.create_access_token({'sub': username})}"}
+
+
+@pytest.fixture
+def admin_headers(db):
+    admin = db.query(models.User).filter(models.User.role == "admin").first()
+    return token_headers(admin.username)
+
+
+@pytest.fixture
+def employee_headers(db):
+    """Headers for the employee with this id."""
+    def headers(employee_id):
+        username = db.query(models.User.username).join(models.Employee, models.Employee.user_id == models.User.id)\
+            .filter(models.Employee.id == employee_id).scalar()
+        return token_headers(username)
+    return headers
+
+
+@pytest.fixture
+def count_statements():
+    """Context manager collecting the SQL statements executed on the sync engine.
+
+    Batches the audit writer flushes from its own thread are left out; they land at random times.
+    """
+    @contextmanager
+    def counting():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if threading.current_thread().name != "audit-writer":
+                statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return counting
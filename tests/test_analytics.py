@@ -0,0 +1,42 @@
+"""The window-function and NumPy engines give the same growth summary and series."""
+from datetime import timedelta
+
+import pytest
+
+from backend import analytics, models
+from backend.rollover import get_today_date
+
+pytest.importorskip("numpy")
+
+
+def _under(monkeypatch, db, engine, fn, *args, **kwargs):
+    monkeypatch.setattr(analytics, "ANALYTICS_ENGINE", engine)
+    result = fn(db, *args, **kwargs)
+    assert result.pop("engine") == engine
+    return result
+
+
+def test_engines_agree(monkeypatch, synth, db):
+    if not analytics.window_functions_supported(db):
+        pytest.skip("SQLite without window functions")
+    synth(employees=4, accounts=60, days=20)
+    today = get_today_date()
+    ranges = [
+        (today - timedelta(days=30), today),
+        # Starts mid-history, so the first deltas come from reports before the range
+        (today - timedelta(days=8), today - timedelta(days=2)),
+        # Nothing reported in it
+        (today + timedelta(days=5), today + timedelta(days=9)),
+    ]
+    employee_id = db.query(models.Employee.id).order_by(models.Employee.id).first()[0]
+    account_id = db.query(models.DailyReport.instagram_account_id).order_by(models.DailyReport.id).first()[0]
+
+    for start, end in ranges:
+        summaries = [_under(monkeypatch, db, e, analytics.growth_summary, start, end, k=5) for e in ("sql", "numpy")]
+        assert summaries[0] == summaries[1]
+        for kwargs in ({"account_id": account_id}, {"employee_id": employee_id}):
+            series = [_under(monkeypatch, db, e, analytics.growth_series, start, end, **kwargs) for e in ("sql", "numpy")]
+            assert series[0] == series[1]
+
+    assert summaries[0]["gainers"] == summaries[0]["employees"] == [] and summaries[0]["total_growth"] == 0
+    assert series[0]["series"] == []
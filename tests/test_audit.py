@@ -0,0 +1,15 @@
+"""The audit queue never makes a request wait; a full queue drops and counts the event."""
+import time
+
+from backend.audit import AuditWriter
+
+
+def test_full_queue_drops_without_waiting():
+    writer = AuditWriter(max_queue=2)
+    started = time.perf_counter()
+    results = [writer.enqueue(1, "LOGIN", "User logged in", "127.0.0.1") for _ in range(50)]
+    elapsed = time.perf_counter() - started
+
+    assert results == [True, True] + [False] * 48
+    assert (writer.stats()["queued"], writer.stats()["dropped"]) == (2, 48)
+    assert elapsed < 0.5
@@ -0,0 +1,42 @@
+"""Cached principals are evicted as soon as their user changes."""
+from backend import auth, models
+
+
+def _login(client, username, password="password"):
+    resp = client.post("/api/login", data={"username": username, "password": password})
+    assert resp.status_code == 200, resp.text
+    token = resp.json()["access_token"]
+    return token, {"Authorization": f"Bearer {token}"}
+
+
+def _employee(db):
+    emp = db.query(models.Employee).order_by(models.Employee.id).first()
+    return emp.id, db.query(models.User.username).filter(models.User.id == emp.user_id).scalar()
+
+
+def test_delete_employee_rejects_old_token(client, synth, db, admin_headers):
+    synth(employees=2, accounts=10)
+    emp_id, username = _employee(db)
+    token, headers = _login(client, username)
+    assert client.get("/employee/report-status", headers=headers).status_code == 200
+    assert auth.principal_cache.get(token) is not None
+
+    assert client.delete(f"/admin/delete-employee/{emp_id}", headers=admin_headers).status_code == 200
+
+    assert auth.principal_cache.get(token) is None
+    assert client.get("/employee/report-status", headers=headers).status_code == 401
+    assert client.get("/api/employee/dashboard-data", headers=headers).status_code == 401
+
+
+def test_reset_password_evicts_principal(client, synth, db, admin_headers):
+    synth(employees=2, accounts=10)
+    emp_id, username = _employee(db)
+    token, headers = _login(client, username)
+    assert client.get("/employee/report-status", headers=headers).status_code == 200
+
+    resp = client.post("/admin/reset-password", headers=admin_headers, json={"employee_id": emp_id, "new_password": "changed"})
+    assert resp.status_code == 200
+    assert auth.principal_cache.get(token) is None
+
+    assert client.post("/api/login", data={"username": username, "password": "password"}).status_code == 401
+    _login(client, username, "changed")
@@ -0,0 +1,72 @@
+"""The benchmark CLI runs end to end in both database modes; compare() catches regressions."""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from backend.bench import stats
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _have(*modules):
+    for name in modules:
+        try:
+            __import__(name)
+        except ImportError:
+            return False
+    return True
+
+
+@pytest.mark.skipif(not _have("httpx", "aiosqlite", "greenlet"), reason="async mode needs aiosqlite and greenlet")
+def test_bench_runs_sync_and_async(tmp_path):
+    # `python -m backend.bench` needs a directory that contains the package under its real name
+    pkgroot = tmp_path / "pkgroot"
+    pkgroot.mkdir()
+    (pkgroot / "backend").symlink_to(ROOT, target_is_directory=True)
+    env = dict(os.environ, PYTHONPATH=str(pkgroot), PASSWORD_HASH_ROUNDS="1000")
+    env.pop("DATABASE_ASYNC", None)
+    out = tmp_path / "results.json"
+
+    proc = subprocess.run([
+        sys.executable, "-m", "backend.bench", "--modes", "sync,async", "--generate",
+        "--database-url", f"sqlite:///{tmp_path / 'bench.db'}",
+        "--employees", "3", "--accounts", "40", "--days", "3", "--users", "3",
+        "--polls", "1", "--reports-per-employee", "1",
+        "--scenarios", "report_submissions,admin_polling", "--out", str(out),
+    ], cwd=tmp_path, env=env, capture_output=True, text=True, timeout=600)
+    assert proc.returncode == 0, proc.stdout[-2000:] + proc.stderr[-2000:]
+
+    results = json.loads(out.read_text())["modes"]
+    assert {mode: r["meta"]["mode"] for mode, r in results.items()} == {"sync": "sync", "async": "async"}
+    for r in results.values():
+        assert set(r["scenarios"]) == {"report_submissions", "admin_polling"}
+        for endpoints in r["scenarios"].values():
+            for figures in endpoints.values():
+                assert figures["errors"] == 0
+                assert figures["bytes_per_response"] > 0
+        assert r["cpu"]["admin_polling"]["requests"] == 4
+
+
+def _results(**figures):
+    base = {"requests": 10, "throughput_rps": 100.0, "p50_ms": 5.0, "p95_ms": 8.0, "p99_ms": 9.0,
+            "sql_statements": 2.0, "bytes_per_response": 1000, "errors": 0, "statuses": {"200": 10}}
+    base.update(figures)
+    return {"scenarios": {"s": {"GET /x": base}}, "cpu": {"s": {"cpu_ms_per_request": 4.0}}}
+
+
+def test_compare_flags_errors():
+    regressions = stats.compare(_results(errors=3, statuses={"200": 7, "500": 3}), _results())
+    assert regressions == ["s GET /x: errors 0 -> 3 (statuses {'200': 7, '500': 3})"]
+
+
+def test_compare_thresholds():
+    assert stats.compare(_results(p95_ms=9.0), _results()) == []
+    assert stats.compare(_results(sql_statements=3.0), _results()) == ["s GET /x: sql_statements 2.0 -> 3.0"]
+    # Figures an older baseline doesn't have are not compared
+    old = _results()
+    del old["scenarios"]["s"]["GET /x"]["bytes_per_response"]
+    assert stats.compare(_results(bytes_per_response=5000), old) == []
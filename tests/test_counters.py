@@ -0,0 +1,79 @@
+"""Employee.assigned_count / total_downloads stay equal to the source tables through every write path."""
+from datetime import timedelta
+
+from backend import counters, models
+from backend.rollover import get_today_date
+
+
+def _employee_ids(db):
+    return [e for (e,) in db.query(models.Employee.id).order_by(models.Employee.id)]
+
+
+def test_seeded_counters_have_no_drift(synth, db):
+    synth(employees=6, accounts=90)
+    assert counters.find_drift(db) == []
+
+
+def test_write_paths_keep_counters(client, synth, db, admin_headers, employee_headers):
+    synth(employees=4, accounts=60)
+    emp_ids = _employee_ids(db)
+    today = get_today_date()
+
+    resp = client.post("/admin/create-employee", headers=admin_headers,
+                       json={"username": "fresh", "password": "pw123456", "full_name": "Fresh Employee"})
+    assert resp.status_code == 200
+    fresh = db.query(models.Employee.id).join(models.User, models.User.id == models.Employee.user_id)\
+        .filter(models.User.username == "fresh").scalar()
+    client.post("/api/admin/update-quota", headers=admin_headers, json={"employee_id": fresh, "amount": 20})
+
+    # Assign (single employee and distributed), bulk create, delete an account
+    client.post("/admin/assign-accounts", headers=admin_headers, json={"employee_id": fresh, "limit": 2})
+    client.post("/admin/assign-accounts", headers=admin_headers,
+                json={"employee_ids": emp_ids[:2], "mode": "round_robin", "limit": 3})
+    resp = client.post("/employee/bulk-create-accounts", headers=employee_headers(fresh),
+                       json={"accounts": [{"username": f"bulk_{i}", "password": "pw"} for i in range(3)]})
+    assert resp.status_code == 200, resp.text
+    victim = db.query(models.InstagramAccount.id).filter(models.InstagramAccount.assigned_employee_id == emp_ids[0]).first()[0]
+    assert client.delete(f"/admin/instagram-account/{victim}", headers=admin_headers).status_code == 200
+
+    # Downloads
+    for emp_id, count in ((fresh, 7), (emp_ids[1], 11)):
+        resp = client.post("/admin/add-download-record", headers=admin_headers, json={
+            "employee_id": emp_id, "start_date": str(today - timedelta(days=6)), "end_date": str(today), "count": count
+        })
+        assert resp.status_code == 200
+
+    db.expire_all()
+    assert counters.find_drift(db) == []
+    fresh_row = db.get(models.Employee, fresh)
+    assert fresh_row.assigned_count == 5
+    assert fresh_row.total_downloads == 7
+
+
+def test_quota_is_enforced_from_counter(client, synth, db, admin_headers, employee_headers):
+    synth(employees=2, accounts=20)
+    emp_id = _employee_ids(db)[0]
+    assigned = db.get(models.Employee, emp_id).assigned_count
+    resp = client.post("/api/admin/update-quota", headers=admin_headers, json={"employee_id": emp_id, "amount": assigned + 1})
+    assert resp.status_code == 200
+
+    resp = client.post("/employee/bulk-create-accounts", headers=employee_headers(emp_id),
+                       json={"accounts": [{"username": f"over_{i}", "password": "pw"} for i in range(2)]})
+    assert resp.status_code == 400
+    db.expire_all()
+    assert db.get(models.Employee, emp_id).assigned_count == assigned
+    assert counters.find_drift(db) == []
+
+
+def test_reconcile_fixes_drift(synth, db):
+    synth(employees=3, accounts=30)
+    emp_id = _employee_ids(db)[0]
+    db.query(models.Employee).filter(models.Employee.id == emp_id).update(
+        {models.Employee.assigned_count: 999, models.Employee.total_downloads: -1}
+    )
+    db.commit()
+
+    drift = counters.reconcile(db)
+    assert {d["field"] for d in drift} == {"assigned_count", "total_downloads"}
+    db.expire_all()
+    assert counters.find_drift(db) == []
@@ -0,0 +1,100 @@
+"""assign-accounts distribution modes."""
+import pytest
+
+from backend import counters, distribution, models
+
+
+def _make_employees(client, db, admin_headers, quotas):
+    ids = []
+    for i, quota in enumerate(quotas):
+        resp = client.post("/admin/create-employee", headers=admin_headers,
+                           json={"username": f"dist{i}", "password": "pw123456", "full_name": f"Dist {i}"})
+        assert resp.status_code == 200
+        emp_id = db.query(models.Employee.id).join(models.User, models.User.id == models.Employee.user_id)\
+            .filter(models.User.username == f"dist{i}").scalar()
+        client.post("/api/admin/update-quota", headers=admin_headers, json={"employee_id": emp_id, "amount": quota})
+        ids.append(emp_id)
+    return ids
+
+
+def _add_unassigned(client, admin_headers, n):
+    for i in range(n):
+        resp = client.post("/admin/create-instagram-account", headers=admin_headers,
+                           json={"username": f"pool{i:03d}", "password": "pw"})
+        assert resp.status_code == 200
+
+
+def _assigned(db, emp_ids):
+    IA = models.InstagramAccount
+    db.expire_all()
+    return [db.query(IA).filter(IA.assigned_employee_id == e).count() for e in emp_ids]
+
+
+@pytest.mark.parametrize("mode, body, expected", [
+    ("round_robin", {"limit": 10}, [4, 3, 3]),
+    ("weighted", {"limit": 10, "weights": {"0": 3, "1": 1, "2": 1}}, [6, 2, 2]),
+    ("fill", {"limit": None}, [2, 5, 3]),
+])
+def test_distribution_modes(client, db, admin_headers, mode, body, expected):
+    emp_ids = _make_employees(client, db, admin_headers, quotas=[2, 5, 20])
+    _add_unassigned(client, admin_headers, 10)
+
+    if "weights" in body:
+        body = dict(body, weights={str(emp_ids[int(k)]): w for k, w in body["weights"].items()})
+    resp = client.post("/admin/assign-accounts", headers=admin_headers,
+                       json=dict(body, employee_ids=emp_ids, mode=mode))
+    assert resp.status_code == 200
+    assert resp.json()["count"] == 10
+    assert _assigned(db, emp_ids) == expected
+    assert counters.find_drift(db) == []
+
+
+def test_distribution_never_hands_out_more_than_available(client, db, admin_headers):
+    emp_ids = _make_employees(client, db, admin_headers, quotas=[50, 50])
+    _add_unassigned(client, admin_headers, 3)
+
+    resp = client.post("/admin/assign-accounts", headers=admin_headers,
+                       json={"employee_ids": emp_ids, "mode": "round_robin", "limit": 100})
+    assert resp.json()["count"] == 3
+    assert sum(_assigned(db, emp_ids)) == 3
+
+    resp = client.post("/admin/assign-accounts", headers=admin_headers,
+                       json={"employee_ids": emp_ids, "mode": "round_robin", "limit": 100})
+    assert resp.json()["status"] == "info"
+
+
+def test_unknown_mode_is_rejected(client, db, admin_headers):
+    emp_ids = _make_employees(client, db, admin_headers, quotas=[5])
+    resp = client.post("/admin/assign-accounts", headers=admin_headers,
+                       json={"employee_ids": emp_ids, "mode": "random"})
+    assert resp.status_code == 400
+
+
+def test_split_is_exact():
+    assert distribution._split(10, [1, 1, 1]) == [4, 3, 3]
+    assert distribution._split(7, [0, 0]) == [0, 0]
+    assert sum(distribution._split(1001, [0.3, 0.3, 0.4])) == 1001
+
+
+def test_fill_rechecks_quota_when_plan_is_stale(client, db, admin_headers, monkeypatch):
+    emp_ids = _make_employees(client, db, admin_headers, quotas=[5])
+    _add_unassigned(client, admin_headers, 10)
+    # A concurrent fill used the room after this request planned with it
+    planned = distribution.plan_distribution(db, emp_ids, "fill", 10)
+    client.post("/admin/assign-accounts", headers=admin_headers, json={"employee_id": emp_ids[0], "limit": 3})
+    monkeypatch.setattr(distribution, "plan_distribution", lambda *args, **kwargs: planned)
+
+    resp = client.post("/admin/assign-accounts", headers=admin_headers,
+                       json={"employee_ids": emp_ids, "mode": "fill", "limit": None})
+    assert resp.json()["count"] == 2
+    assert _assigned(db, emp_ids) == [5]
+    assert counters.find_drift(db) == []
+
+
+def test_fill_releases_unused_reservation(db, client, admin_headers):
+    emp_ids = _make_employees(client, db, admin_headers, quotas=[10])
+    _add_unassigned(client, admin_headers, 2)
+    assert distribution.claim_within_quota(db, emp_ids[0], 6) == 2
+    db.commit()
+    assert db.get(models.Employee, emp_ids[0]).assigned_count == 2
+    assert counters.find_drift(db) == []
@@ -0,0 +1,67 @@
+"""The employee hot path: login, dashboard, report submit and status.
+
+These routes have async versions (async_routes.py) that replace the sync ones when
+DATABASE_ASYNC=1; test_async_mode runs the whole suite again in that mode.
+"""
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from backend import database, models
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _login(client, username, password="password"):
+    resp = client.post("/api/login", data={"username": username, "password": password})
+    assert resp.status_code == 200, resp.text
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+def test_employee_flow(client, synth, db):
+    synth(employees=2, accounts=20)
+    emp = db.query(models.Employee).order_by(models.Employee.id).first()
+    username = db.query(models.User.username).filter(models.User.id == emp.user_id).scalar()
+
+    assert client.post("/api/login", data={"username": username, "password": "wrong"}).status_code == 401
+    headers = _login(client, username)
+
+    dashboard = client.get("/api/employee/dashboard-data", headers=headers).json()
+    assigned = [a["id"] for a in dashboard["assigned_accounts"]]
+    assert dashboard["quota"] == emp.account_quota
+    assert assigned == sorted(a for (a,) in db.query(models.InstagramAccount.id)
+                              .filter(models.InstagramAccount.assigned_employee_id == emp.id))
+
+    report = {"instagram_account_id": assigned[0], "follower_count": 120}
+    assert client.post("/employee/report", headers=headers, json=report).json() == {"status": "success"}
+    report["follower_count"] = 150
+    assert client.post("/employee/report", headers=headers, json=report).json() == {"status": "updated"}
+
+    other = db.query(models.InstagramAccount.id).filter(models.InstagramAccount.assigned_employee_id != emp.id).first()[0]
+    resp = client.post("/employee/report", headers=headers, json={"instagram_account_id": other, "follower_count": 1})
+    assert resp.status_code == 403
+
+    status = client.get("/employee/report-status", headers=headers).json()
+    assert status == [{"account_id": assigned[0], "count": 150, "locked": False}]
+
+
+def _have(*modules):
+    for name in modules:
+        try:
+            __import__(name)
+        except ImportError:
+            return False
+    return True
+
+
+@pytest.mark.skipif(database.ASYNC_DB, reason="already running in async mode")
+@pytest.mark.skipif(not _have("aiosqlite", "greenlet"), reason="async mode needs aiosqlite and greenlet")
+def test_async_mode():
+    # Same suite against the async routes and engine, in a fresh interpreter since the engine is built on import
+    env = dict(os.environ, DATABASE_ASYNC="1")
+    proc = subprocess.run([sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", str(ROOT / "tests")],
+                          cwd=ROOT, env=env, capture_output=True, text=True, timeout=900)
+    assert proc.returncode == 0, proc.stdout[-3000:] + proc.stderr[-2000:]
@@ -0,0 +1,67 @@
+"""The admin list endpoints run a fixed number of statements however many employees exist."""
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import func
+
+from backend import cache, models
+from backend.rollover import get_today_date
+
+
+def _statements_for(client, count_statements, url, headers):
+    cache.response_cache.clear()
+    with count_statements() as statements:
+        resp = client.get(url, headers=headers)
+    assert resp.status_code == 200
+    return len(statements), resp.json()
+
+
+@pytest.mark.parametrize("url", [
+    "/admin/employees",
+    "/admin/download-stats",
+    "/admin/download-stats?start_date={start}&end_date={end}",
+])
+def test_statement_count_does_not_grow_with_employees(client, synth, admin_headers, count_statements, url):
+    today = get_today_date()
+    url = url.format(start=today - timedelta(days=30), end=today)
+
+    synth(employees=3, accounts=30)
+    # Warm the principal cache so the auth lookup is not part of the comparison
+    client.get("/admin/employees", headers=admin_headers)
+    small, _ = _statements_for(client, count_statements, url, admin_headers)
+
+    synth(employees=20, accounts=200, prefix="more", seed_value=7)
+    large, body = _statements_for(client, count_statements, url, admin_headers)
+
+    assert small == large
+    rows = body if isinstance(body, list) else body["employees"]
+    assert len(rows) == 23
+
+
+def test_employee_list_matches_assignments(client, synth, db, admin_headers):
+    synth(employees=5, accounts=80)
+    IA = models.InstagramAccount
+    actual = dict(db.query(IA.assigned_employee_id, func.count(IA.id))
+                  .filter(IA.assigned_employee_id != None).group_by(IA.assigned_employee_id).all())
+
+    body = client.get("/admin/employees", headers=admin_headers).json()
+    assert [row["id"] for row in body] == sorted(row["id"] for row in body)
+    for row in body:
+        assert row["assigned_count"] == actual.get(row["id"], 0)
+
+
+def test_download_stats_totals(client, synth, db, admin_headers):
+    synth(employees=5, accounts=80, days=20)
+    today = get_today_date()
+    start, end = today - timedelta(days=10), today
+    R = models.DownloadRecord
+    totals = dict(db.query(R.employee_id, func.sum(R.count)).group_by(R.employee_id).all())
+    in_range = dict(db.query(R.employee_id, func.sum(R.count))
+                    .filter(R.start_date >= start, R.end_date <= end).group_by(R.employee_id).all())
+
+    body = client.get(f"/admin/download-stats?start_date={start}&end_date={end}", headers=admin_headers).json()
+    assert body["total_downloads"] == sum(totals.values())
+    assert body["range_total"] == sum(in_range.values())
+    for row in body["employees"]:
+        assert row["total_downloads"] == totals.get(row["id"], 0)
+        assert row["range_downloads"] == in_range.get(row["id"], 0)
@@ -0,0 +1,58 @@
+"""Cached responses: ETag/304, invalidation by table version, compression done once per encoding."""
+import gzip
+import json
+
+from backend import cache, fastjson
+
+
+def test_etag_and_invalidation(client, synth, admin_headers):
+    synth(employees=3, accounts=30)
+    first = client.get("/admin/employees", headers=admin_headers)
+    etag = first.headers["ETag"]
+
+    again = client.get("/admin/employees", headers=dict(admin_headers, **{"If-None-Match": etag}))
+    assert again.status_code == 304
+
+    cache.bump(cache.EMPLOYEES)
+    # Same data, new entry: the body (and so the ETag) is unchanged
+    assert client.get("/admin/employees", headers=dict(admin_headers, **{"If-None-Match": etag})).status_code == 304
+
+
+def test_cached_body_is_compressed_once(client, synth, admin_headers, monkeypatch):
+    synth(employees=3, accounts=30)
+    monkeypatch.setattr(fastjson, "COMPRESS_MIN_SIZE", 1)
+    calls = []
+    real_compress = fastjson.compress
+
+    def counting_compress(body, encoding):
+        calls.append(encoding)
+        return real_compress(body, encoding)
+
+    monkeypatch.setattr(fastjson, "compress", counting_compress)
+    headers = dict(admin_headers, **{"Accept-Encoding": "gzip"})
+
+    bodies = []
+    for _ in range(3):
+        resp = client.get("/admin/download-stats", headers=headers)
+        assert resp.headers["Content-Encoding"] == "gzip"
+        bodies.append(resp.json())
+    assert calls == ["gzip"]
+    assert bodies[0] == bodies[1] == bodies[2]
+
+    # A client without compression gets the raw bytes of the same entry
+    plain = client.get("/admin/download-stats", headers=dict(admin_headers, **{"Accept-Encoding": "identity"}))
+    assert "Content-Encoding" not in plain.headers
+    assert plain.json() == bodies[0]
+    assert calls == ["gzip"]
+
+
+def test_json_bytes_response_fills_variants(monkeypatch):
+    class FakeRequest:
+        headers = {"accept-encoding": "gzip"}
+
+    monkeypatch.setattr(fastjson, "COMPRESS_MIN_SIZE", 1)
+    body = fastjson.dumps({"rows": list(range(100))})
+    variants = {}
+    resp = fastjson.json_bytes_response(FakeRequest(), body, variants=variants)
+    assert json.loads(gzip.decompress(resp.body)) == {"rows": list(range(100))}
+    assert variants == {"gzip": resp.body}
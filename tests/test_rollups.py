@@ -0,0 +1,105 @@
+"""The maintained rollup tables equal a rebuild from daily_reports / download_records after each write path."""
+from datetime import timedelta
+
+from sqlalchemy import func
+
+from backend import models, rollups
+from backend.rollover import get_today_date
+
+
+def _snapshot(db):
+    db.expire_all()
+    return (
+        sorted(map(tuple, db.query(models.DownloadDailyRollup.employee_id, models.DownloadDailyRollup.day,
+                                   models.DownloadDailyRollup.count).all())),
+        sorted(map(tuple, db.query(models.DownloadDailyTotal.day, models.DownloadDailyTotal.count).all())),
+        sorted(map(tuple, db.query(models.DailyFollowerTotal.day, models.DailyFollowerTotal.total_followers,
+                                   models.DailyFollowerTotal.report_count).all())),
+        sorted(map(tuple, db.query(models.EmployeeDailyFollowerTotal.employee_id, models.EmployeeDailyFollowerTotal.day,
+                                   models.EmployeeDailyFollowerTotal.total_followers,
+                                   models.EmployeeDailyFollowerTotal.report_count).all())),
+    )
+
+
+def _assert_matches_rebuild(db):
+    maintained = _snapshot(db)
+    rollups.rebuild_download_rollup(db)
+    rollups.rebuild_report_totals(db)
+    assert maintained == _snapshot(db)
+
+
+def _employee_with_accounts(db, n=3):
+    IA = models.InstagramAccount
+    for (emp_id,) in db.query(models.Employee.id).order_by(models.Employee.id):
+        accounts = [a for (a,) in db.query(IA.id).filter(IA.assigned_employee_id == emp_id).order_by(IA.id).limit(n)]
+        if len(accounts) == n:
+            return emp_id, accounts
+    raise AssertionError("no employee with enough accounts")
+
+
+def test_report_writes_keep_follower_totals(client, synth, db, admin_headers, employee_headers):
+    synth(employees=4, accounts=60)
+    emp_id, accounts = _employee_with_accounts(db)
+    headers = employee_headers(emp_id)
+
+    # Single submit, then an update of the same report
+    assert client.post("/employee/report", headers=headers,
+                       json={"instagram_account_id": accounts[0], "follower_count": 1000}).json()["status"] == "success"
+    assert client.post("/employee/report", headers=headers,
+                       json={"instagram_account_id": accounts[0], "follower_count": 1250}).json()["status"] == "updated"
+    # Batch: one update, one new, the last value of a repeated account wins
+    resp = client.post("/employee/report/batch", headers=headers, json=[
+        {"instagram_account_id": accounts[0], "follower_count": 1300},
+        {"instagram_account_id": accounts[1], "follower_count": 10},
+        {"instagram_account_id": accounts[1], "follower_count": 500},
+    ])
+    assert {r["status"] for r in resp.json()["results"]} == {"updated", "submitted"}
+
+    today = get_today_date()
+    total = db.query(models.DailyFollowerTotal).filter(models.DailyFollowerTotal.day == today).one()
+    assert (total.total_followers, total.report_count) == (1800, 2)
+    _assert_matches_rebuild(db)
+
+    summary = client.get("/admin/daily-summary", headers=admin_headers).json()
+    assert summary["report_count"] == 2
+
+
+def test_download_record_keeps_rollup(client, synth, db, admin_headers):
+    synth(employees=3, accounts=30, days=14)
+    emp_id = db.query(models.Employee.id).first()[0]
+    today = get_today_date()
+    resp = client.post("/admin/add-download-record", headers=admin_headers, json={
+        "employee_id": emp_id, "start_date": str(today - timedelta(days=2)), "end_date": str(today), "count": 9
+    })
+    assert resp.status_code == 200
+    _assert_matches_rebuild(db)
+
+
+def _downloads_by_day(db, since=None):
+    R = models.DownloadRecord
+    query = db.query(R.start_date, func.sum(R.count)).filter(R.start_date != None)
+    if since is not None:
+        query = query.filter(R.start_date >= since)
+    return {d.isoformat(): int(c) for d, c in query.group_by(R.start_date).all()}
+
+
+def test_delete_employee_keeps_download_totals(client, synth, db, admin_headers):
+    synth(employees=4, accounts=60, days=10)
+    emp_id, _ = _employee_with_accounts(db, n=1)
+    week_ago = get_today_date() - timedelta(days=6)
+
+    def served():
+        chart = client.get("/admin/chart-data", headers=admin_headers).json()
+        summary = client.get("/admin/daily-summary", headers=admin_headers).json()
+        return dict(zip(chart["labels"], chart["data"])), {r["date"]: r["count"] for r in summary["downloads_by_date"]}
+
+    before = served()
+    assert before == (_downloads_by_day(db), _downloads_by_day(db, week_ago))
+
+    assert client.delete(f"/admin/delete-employee/{emp_id}", headers=admin_headers).status_code == 200
+
+    assert db.query(models.DownloadRecord).filter(models.DownloadRecord.employee_id == emp_id).count() == 0
+    assert db.query(models.DailyReport).filter(models.DailyReport.employee_id == emp_id).count() == 0
+    # The detached records still count towards the day totals
+    assert served() == before == (_downloads_by_day(db), _downloads_by_day(db, week_ago))
+    _assert_matches_rebuild(db)
@@ -0,0 +1,60 @@
+"""Slow statements are recorded with their plan, on sync and async drivers."""
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from backend import slowlog
+
+
+def _log_all():
+    return slowlog.SlowQueryLog(threshold_ms=0)
+
+
+def test_records_statement_and_plan(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'sync.db'}")
+    log = _log_all()
+    log.install(engine)
+    with engine.connect() as conn:
+        conn.execute(text("CREATE TABLE t (id INTEGER PRIMARY KEY, v INTEGER)"))
+        conn.execute(text("SELECT v FROM t WHERE id = :id"), {"id": 1})
+
+    group = next(g for g in log.snapshot()["groups"] if g["statement"].startswith("SELECT v FROM t"))
+    assert group["count"] == 1
+    assert group["plan"] and not group["plan"][0].startswith("EXPLAIN failed")
+
+
+def test_failed_explain_keeps_the_entry(tmp_path, monkeypatch):
+    def broken(*args):
+        raise RuntimeError("no plan")
+
+    monkeypatch.setattr(slowlog, "_explain", broken)
+    engine = create_engine(f"sqlite:///{tmp_path / 'sync.db'}")
+    log = _log_all()
+    log.install(engine)
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+    snapshot = log.snapshot()
+    assert [g["plan"] for g in snapshot["groups"] if g["statement"] == "SELECT ?"] == [None]
+    assert any(e["statement"] == "SELECT ?" for e in snapshot["recent"])
+
+
+def test_async_driver_plan(tmp_path):
+    pytest.importorskip("aiosqlite")
+    pytest.importorskip("greenlet")
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'async.db'}")
+    log = _log_all()
+    log.install(engine.sync_engine)
+
+    async def run():
+        async with engine.connect() as conn:
+            await conn.execute(text("CREATE TABLE t (id INTEGER PRIMARY KEY, v INTEGER)"))
+            await conn.execute(text("SELECT v FROM t WHERE id = :id"), {"id": 1})
+        await engine.dispose()
+
+    asyncio.run(run())
+    group = next(g for g in log.snapshot()["groups"] if g["statement"].startswith("SELECT v FROM t"))
+    assert group["plan"] and not group["plan"][0].startswith("EXPLAIN failed")